@@ -1,13 +1,47 @@
 import heapq
-from mazeParser import apply_dynamic_wall_changes
+import numpy as np
+from distanceField import UNREACHABLE
+from hpaStar import HPAStar
+from mazeParser import TriggerIndex
+
+PLANNING_MODES = ('full', 'incremental', 'hierarchical')
+SEARCH_METHODS = ('astar', 'grid', 'jps')
+INF = float('inf')
+
+
+def walk_back(g_score, start, goal, neighbors):
+    """Shortest path from start to goal, rebuilt from g-values by walking back from goal.
+
+    Each step goes to the first neighbor, in the order neighbors lists them, whose
+    g-value is one less. A search ordered by (f, g) with a consistent heuristic has
+    the exact g of every cell on every shortest path when it reaches the goal, and
+    any neighbor with that g lies on one, so the path depends only on the maze and
+    not on which extra cells the search happened to touch.
+    """
+    path = [goal]
+    current = goal
+    d = g_score[goal]
+    while current != start:
+        d -= 1
+        current = next(n for n in neighbors(current) if g_score.get(n, INF) == d)
+        path.append(current)
+    path.reverse()
+    return path
+
 
 class AStar:
-    def __init__(self, maze, start, goal):
+    def __init__(self, maze, start, goal, distance_field=None):
         self.maze = maze
         self.start = start
         self.goal = goal
+        self.distance_field = distance_field  # Optional GoalDistanceField used as a perfect heuristic
         self.rows = maze.shape[0]
         self.cols = maze.shape[1]
+        self.expanded_nodes = 0  # Nodes popped by the most recent search
+        self.triggers = None  # TriggerIndex of the most recent a_star_with_dynamic_changes call
+        self.replans = 0  # Searches run by the most recent a_star_with_dynamic_changes call
+        self.hierarchy = None  # HPAStar kept for mode='hierarchical'; set one to reuse a prebuilt abstract graph
+        self.row_jumps = {}  # (x, y, dy) -> horizontal jump result, for the current jump_point_search
 
     def is_valid_move(self, x, y):
         """Check if the move is valid (within bounds and not a wall)."""
@@ -25,59 +59,379 @@ class AStar:
         return neighbors
 
     def heuristic(self, node):
-        """Calculate the Manhattan distance heuristic."""
+        """Calculate the Manhattan distance heuristic, or the exact distance if a distance field is set."""
+        if self.distance_field is not None:
+            distance = self.distance_field.distance(node)
+            return INF if distance == UNREACHABLE else distance
         x, y = node
         gx, gy = self.goal
         return abs(x - gx) + abs(y - gy)
 
-    def a_star_search(self):
-        """Perform A* search to find the shortest path."""
+    def a_star_search(self, method='astar'):
+        """Perform A* search to find the shortest path.
+
+        method='grid' runs a_star_search_grid and method='jps' runs jump_point_search;
+        all three return shortest paths of the same length.
+        """
+        if method not in SEARCH_METHODS:
+            raise ValueError(f"Unknown search method {method!r}, expected one of {SEARCH_METHODS}")
+        if self.heuristic(self.start) == INF:
+            return None  # The distance field already knows the goal is cut off
+        if method == 'grid':
+            return self.a_star_search_grid()
+        if method == 'jps':
+            return self.jump_point_search()
         open_set = []
         heapq.heappush(open_set, (0 + self.heuristic(self.start), 0, self.start))  # (f, g, node)
-        came_from = {}  # To reconstruct the path
         g_score = {self.start: 0}
         f_score = {self.start: self.heuristic(self.start)}
+        self.expanded_nodes = 0
 
         while open_set:
             _, current_g, current = heapq.heappop(open_set)
+            self.expanded_nodes += 1
 
             if current == self.goal:
-                return self.reconstruct_path(came_from, current)
+                return self.reconstruct_path(g_score, current)
 
             for neighbor in self.get_neighbors(current):
                 tentative_g_score = g_score[current] + 1  # Assuming uniform cost for each move
                 if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
                     g_score[neighbor] = tentative_g_score
                     f_score[neighbor] = tentative_g_score + self.heuristic(neighbor)
                     heapq.heappush(open_set, (f_score[neighbor], tentative_g_score, neighbor))
 
         return None  # No path found
-    def a_star_with_dynamic_changes(self, dynamic_walls, visited_cells):
-        """Perform A* search with dynamic wall updates."""
-        triggered_walls = set()  # Track triggered walls
+
+    def a_star_search_grid(self):
+        """A* on flat arrays indexed by x * cols + y.
+
+        Each cell is expanded at most once (closed-set bitmap), and ties on f are
+        broken towards the smaller heuristic, so the search runs straight at the goal
+        instead of fanning out across equal-cost cells.
+        """
+        rows, cols = self.rows, self.cols
+        gx, gy = self.goal
+        passable = (self.maze != 1).ravel()
+        exact = self.distance_field.distances.ravel() if self.distance_field is not None else None
+        g_score = np.full(rows * cols, -1, dtype=np.int32)  # -1 marks unseen cells
+        came_from = np.full(rows * cols, -1, dtype=np.int32)
+        closed = np.zeros(rows * cols, dtype=bool)
+
+        start = self.start[0] * cols + self.start[1]
+        goal = gx * cols + gy
+        g_score[start] = 0
+        h = self.heuristic(self.start)
+        open_set = [(h, h, start)]  # (f, h, cell)
+        self.expanded_nodes = 0
+
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            if closed[current]:
+                continue  # Stale duplicate of an expanded cell
+            closed[current] = True
+            self.expanded_nodes += 1
+
+            if current == goal:
+                return self.reconstruct_grid_path(came_from, current)
+
+            x, y = divmod(current, cols)
+            tentative_g_score = int(g_score[current]) + 1
+            for nx, ny in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):  # Right, Down, Left, Up
+                if 0 <= nx < rows and 0 <= ny < cols:
+                    neighbor = nx * cols + ny
+                    if passable[neighbor] and not closed[neighbor] and (
+                        g_score[neighbor] < 0 or tentative_g_score < g_score[neighbor]
+                    ):
+                        if exact is None:
+                            h = abs(nx - gx) + abs(ny - gy)
+                        elif exact[neighbor] == UNREACHABLE:
+                            continue  # No path to the goal from here
+                        else:
+                            h = int(exact[neighbor])
+                        g_score[neighbor] = tentative_g_score
+                        came_from[neighbor] = current
+                        heapq.heappush(open_set, (tentative_g_score + h, h, neighbor))
+
+        return None  # No path found
+
+    def jump_point_search(self):
+        """Jump Point Search for 4-connected, uniform-cost movement.
+
+        Straight runs of cells without forced neighbors are skipped by jump(), so only
+        jump points enter the open set; expanded_nodes counts those jump points.
+        """
+        open_set = [(self.heuristic(self.start), self.heuristic(self.start), self.start, None)]  # (f, h, node, parent)
+        g_score = {self.start: 0}
+        came_from = {}
+        closed = set()
+        self.row_jumps = {}
+        self.expanded_nodes = 0
+
+        while open_set:
+            _, _, current, parent = heapq.heappop(open_set)
+            if current in closed:
+                continue
+            closed.add(current)
+            came_from[current] = parent
+            self.expanded_nodes += 1
+
+            if current == self.goal:
+                return self.reconstruct_jump_path(came_from, current)
+
+            for dx, dy in self.pruned_directions(current, parent):
+                jump_point = self.jump(current[0] + dx, current[1] + dy, dx, dy)
+                if jump_point is None or jump_point in closed:
+                    continue
+                tentative_g_score = g_score[current] + abs(jump_point[0] - current[0]) + abs(jump_point[1] - current[1])
+                if jump_point not in g_score or tentative_g_score < g_score[jump_point]:
+                    g_score[jump_point] = tentative_g_score
+                    h = self.heuristic(jump_point)
+                    heapq.heappush(open_set, (tentative_g_score + h, h, jump_point, current))
+
+        return None  # No path found
+
+    def pruned_directions(self, node, parent):
+        """Directions worth scanning from a jump point, given the direction it was reached in."""
+        x, y = node
+        if parent is None:
+            candidates = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+        elif parent[0] == x:  # Reached horizontally: keep going, or turn up/down
+            dy = 1 if y > parent[1] else -1
+            candidates = [(0, dy), (-1, 0), (1, 0)]
+        else:  # Reached vertically: keep going, or turn left/right
+            dx = 1 if x > parent[0] else -1
+            candidates = [(dx, 0), (0, -1), (0, 1)]
+        return [(dx, dy) for dx, dy in candidates if self.is_valid_move(x + dx, y + dy)]
+
+    def jump(self, x, y, dx, dy):
+        """Scan from (x, y) in direction (dx, dy) and return the next jump point, or None."""
+        if dx == 0:
+            return self.jump_horizontal(x, y, dy)
+        while self.is_valid_move(x, y):
+            if (x, y) == self.goal:
+                return (x, y)
+            # Vertical: a column neighbor that opens up behind a wall is a forced neighbor
+            for side in (-1, 1):
+                if self.is_valid_move(x, y + side) and not self.is_valid_move(x - dx, y + side):
+                    return (x, y)
+            # Then look sideways; the row scans are memoized, so this is O(1) amortized
+            if self.jump_horizontal(x, y + 1, 1) is not None or self.jump_horizontal(x, y - 1, -1) is not None:
+                return (x, y)
+            x += dx
+        return None
+
+    def jump_horizontal(self, x, y, dy):
+        """jump() along a row, memoized in row_jumps.
+
+        Every cell scanned before the jump point (or the wall that ends the scan) has
+        the same result, so each (cell, direction) is scanned once per search however
+        many vertical scans look sideways across it.
+        """
+        scanned = []
+        result = None
+        while self.is_valid_move(x, y):
+            key = (x, y, dy)
+            if key in self.row_jumps:
+                result = self.row_jumps[key]
+                break
+            scanned.append(key)
+            if (x, y) == self.goal:
+                result = (x, y)
+                break
+            # A row neighbor that opens up behind a wall is a forced neighbor
+            if any(
+                self.is_valid_move(x + side, y) and not self.is_valid_move(x + side, y - dy) for side in (-1, 1)
+            ):
+                result = (x, y)
+                break
+            y += dy
+        for key in scanned:
+            self.row_jumps[key] = result
+        return result
+
+    def reconstruct_jump_path(self, came_from, current):
+        """Expand the chain of jump points into the full cell-by-cell path."""
+        path = [current]
+        while came_from[current] is not None:
+            parent = came_from[current]
+            dx = (parent[0] > current[0]) - (parent[0] < current[0])
+            dy = (parent[1] > current[1]) - (parent[1] < current[1])
+            while current != parent:
+                current = (current[0] + dx, current[1] + dy)
+                path.append(current)
+        path.reverse()
+        return path
+
+    def a_star_with_dynamic_changes(self, dynamic_walls, visited_cells, mode='full'):
+        """Perform A* search with dynamic wall updates.
+
+        mode='full' reruns a_star_search after every change; mode='incremental' keeps
+        an LPAStar planner and repairs only the part of the search the new walls affect.
+        mode='hierarchical' queries self.hierarchy, an HPAStar built on first use, and
+        rebuilds only the clusters next to new walls; its paths are not always shortest.
+        Afterwards, expanded_nodes counts the nodes expanded over all searches of the call.
+        """
+        if mode not in PLANNING_MODES:
+            raise ValueError(f"Unknown planning mode {mode!r}, expected one of {PLANNING_MODES}")
+        triggers = self.triggers = TriggerIndex(dynamic_walls)  # triggers.events logs placed walls
+        pending_visits = list(visited_cells)  # Cells visited before this call fire on the first step
+        placed_walls = []
+        planner = None
+        if mode == 'incremental':
+            planner = LPAStar(self.maze, self.start, self.goal)
+        elif mode == 'hierarchical':
+            if self.hierarchy is None:
+                self.hierarchy = HPAStar(self.maze)
+            planner = self.hierarchy
+        self.replans = 0
+        expanded = 0
         while True:
-            path = self.a_star_search()  # Find initial path
+            if self.distance_field is not None:
+                self.distance_field.update_walls(placed_walls)
+            if planner is None:
+                path = self.a_star_search()  # Find initial path
+                expanded += self.expanded_nodes
+            elif mode == 'hierarchical':
+                planner.update_walls(placed_walls)
+                path = planner.find_path(self.start, self.goal)
+                expanded += planner.expanded_nodes
+            else:
+                planner.update_walls(placed_walls)
+                path = planner.compute_path()
+                expanded = planner.expanded_nodes  # Cumulative over the planner's lifetime
+            self.expanded_nodes = expanded
+            self.replans += 1
+            placed_walls.clear()
             if path is None:
                 return None  # No path found
 
             for step in path:
                 visited_cells.add(step)  # Mark the cell as visited
+                pending_visits.append(step)
                 # Apply dynamic changes based on visited cells
-                self.maze, changes_made = apply_dynamic_wall_changes(
-                    self.maze, dynamic_walls, visited_cells, triggered_walls
-                )
-                if changes_made:  # If the environment changes, recompute the path
+                for cell in pending_visits:
+                    triggers.visit(self.maze, cell, placed_walls, step=step)
+                pending_visits.clear()
+                if placed_walls:  # If the environment changes, recompute the path
                     break
             else:
                 return path  # Return the path if no changes occurred
 
-    def reconstruct_path(self, came_from, current):
-        """Reconstruct the path from the start to the goal."""
+    def reconstruct_path(self, g_score, current):
+        """Reconstruct the path from the start to the goal along decreasing g-values.
+
+        See walk_back; LPAStar rebuilds its paths the same way, so both planning
+        modes of a_star_with_dynamic_changes pick the same path among equal ones.
+        """
+        return walk_back(g_score, self.start, current, self.get_neighbors)
+
+    def reconstruct_grid_path(self, came_from, current):
+        """Reconstruct the path from the flat parent array of a_star_search_grid."""
         path = []
-        while current in came_from:
-            path.append(current)
+        while current != -1:
+            path.append(divmod(int(current), self.cols))
             current = came_from[current]
-        path.append(self.start)
         path.reverse()
-        return path
\ No newline at end of file
+        return path
+
+
+class LPAStar:
+    """Lifelong Planning A* between a fixed start and goal on the numeric maze.
+
+    g and rhs values are kept between calls to compute_path, so after update_walls
+    only the vertices whose shortest-path distance changed are expanded again.
+    """
+
+    def __init__(self, maze, start, goal):
+        self.maze = maze  # Shared with the caller; report new walls with update_walls
+        self.start = start
+        self.goal = goal
+        self.rows = maze.shape[0]
+        self.cols = maze.shape[1]
+        self.g = {}
+        self.rhs = {start: 0}
+        self.open_set = []  # Heap of (key, node); stale entries are skipped on pop
+        self.open_keys = {}  # Current key of every node in the open set
+        self.expanded_nodes = 0
+        self._push(start)
+
+    def is_valid_move(self, x, y):
+        """Check if the move is valid (within bounds and not a wall)."""
+        return 0 <= x < self.rows and 0 <= y < self.cols and self.maze[x, y] != 1
+
+    def neighbors(self, node):
+        """All in-bounds neighbors of a node, walls included."""
+        x, y = node
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):  # Right, Down, Left, Up
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.rows and 0 <= ny < self.cols:
+                yield (nx, ny)
+
+    def heuristic(self, node):
+        """Calculate the Manhattan distance heuristic."""
+        return abs(node[0] - self.goal[0]) + abs(node[1] - self.goal[1])
+
+    def calculate_key(self, node):
+        best = min(self.g.get(node, INF), self.rhs.get(node, INF))
+        return (best + self.heuristic(node), best)
+
+    def _push(self, node):
+        key = self.calculate_key(node)
+        self.open_keys[node] = key
+        heapq.heappush(self.open_set, (key, node))
+
+    def update_vertex(self, node):
+        """Recompute rhs for a node and fix its membership in the open set."""
+        if node != self.start:
+            if self.is_valid_move(*node):
+                self.rhs[node] = min(
+                    (self.g.get(n, INF) + 1 for n in self.neighbors(node) if self.is_valid_move(*n)),
+                    default=INF,
+                )
+            else:
+                self.rhs[node] = INF  # A wall cannot be reached
+        self.open_keys.pop(node, None)
+        if self.g.get(node, INF) != self.rhs.get(node, INF):
+            self._push(node)
+
+    def update_walls(self, cells):
+        """Repair the search after walls were placed at the given cells."""
+        for cell in cells:
+            self.update_vertex(cell)
+            for n in self.neighbors(cell):
+                self.update_vertex(n)
+
+    def compute_path(self):
+        """Bring the search up to date and return the shortest path, or None."""
+        while self.open_set:
+            key, node = self.open_set[0]
+            if self.open_keys.get(node) != key:
+                heapq.heappop(self.open_set)  # Stale entry
+                continue
+            goal_g = self.g.get(self.goal, INF)
+            if key >= self.calculate_key(self.goal) and self.rhs.get(self.goal, INF) == goal_g:
+                break
+            heapq.heappop(self.open_set)
+            del self.open_keys[node]
+            self.expanded_nodes += 1
+            if self.g.get(node, INF) > self.rhs.get(node, INF):
+                self.g[node] = self.rhs[node]  # Locally overconsistent: settle it
+                for n in self.neighbors(node):
+                    self.update_vertex(n)
+            else:
+                self.g[node] = INF  # Locally underconsistent: raise it and retry
+                self.update_vertex(node)
+                for n in self.neighbors(node):
+                    self.update_vertex(n)
+        return self.reconstruct_path()
+
+    def reconstruct_path(self):
+        """Walk back from the goal along decreasing g-values, as AStar.reconstruct_path does."""
+        if self.g.get(self.goal, INF) == INF:
+            return None
+        return walk_back(self.g, self.start, self.goal, self.valid_neighbors)
+
+    def valid_neighbors(self, node):
+        """In-bounds, non-wall neighbors of a node in Right, Down, Left, Up order."""
+        return [n for n in self.neighbors(node) if self.is_valid_move(*n)]
@@ -0,0 +1,295 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+from astar import PLANNING_MODES, AStar
+from grievers import GrieverSwarm
+from mazeLogging import configure_logging
+from pathService import PathService
+from qlearning import MazeRunner
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (10, 100, 500, 2000)
+SUITES = ('astar', 'dynamic', 'batch', 'train', 'find_path', 'grievers')
+GRIEVER_COUNTS = (2, 4)  # The usual swarm sizes; train ticks the swarm on every step
+
+
+def random_maze(size, wall_density=0.25, grievers=0, triggers=0, seed=0):
+    """A seeded size x size maze with random walls and a guaranteed start-goal path.
+
+    Returns (grid, start, goal, griever positions, dynamic walls) in the numeric form
+    parse_maze_array produces. A random monotone staircase from the top-left start
+    to the bottom-right goal is kept free of walls. Triggers and their targets are
+    taken in order along the initial shortest path, so each trigger the agent steps
+    on puts a wall further along its path and forces a replan.
+    """
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((size, size)) < wall_density).astype(np.int8)
+    start, goal = (0, 0), (size - 1, size - 1)
+
+    # Staircase: size - 1 moves down and size - 1 moves right in random order
+    moves = rng.permutation(np.repeat([0, 1], size - 1))
+    grid[np.concatenate(([0], np.cumsum(moves == 0))), np.concatenate(([0], np.cumsum(moves == 1)))] = 0
+
+    open_cells = np.argwhere(grid == 0)
+    open_cells = open_cells[(open_cells != start).any(axis=1) & (open_cells != goal).any(axis=1)]
+    picks = rng.choice(len(open_cells), size=min(grievers, len(open_cells)), replace=False)
+    griever_cells = [tuple(cell) for cell in open_cells[picks].tolist()]
+
+    dynamic_walls = {}
+    # The path a_star_with_dynamic_changes follows, so the agent steps on the triggers
+    path = AStar(grid, start, goal).a_star_search() if triggers else None
+    if path is not None and len(path) > 3:
+        # Pairs of (trigger, target) path positions, strictly between start and goal
+        count = min(2 * triggers, (len(path) - 2) // 2 * 2)
+        positions = np.sort(rng.choice(np.arange(1, len(path) - 1), size=count, replace=False))
+        for trigger, target in positions.reshape(-1, 2).tolist():
+            dynamic_walls[path[trigger]] = [path[target]]
+    for x, y in griever_cells:
+        grid[x, y] = -1
+    return grid, start, goal, griever_cells, dynamic_walls
+
+
+def measure(fn, repeat=1, memory=True):
+    """Run fn repeat times and return (best seconds, peak traced bytes, last result).
+
+    Peak memory comes from one extra run under tracemalloc, which would otherwise
+    slow down the timed runs.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak, result
+
+
+def bench_astar(maze, repeat=1, memory=True):
+    """Time a_star_search with every search method."""
+    grid, start, goal, _, _ = maze
+    rows = []
+    for method in ('astar', 'grid', 'jps'):
+        planner = AStar(grid, start, goal)
+        seconds, peak, path = measure(lambda: planner.a_star_search(method=method), repeat, memory)
+        rows.append({
+            'case': f'a_star_search[{method}]',
+            'seconds': seconds,
+            'peak_bytes': peak,
+            'expanded_nodes': planner.expanded_nodes,
+            'nodes_per_second': planner.expanded_nodes / seconds if seconds else None,
+            'path_length': None if path is None else len(path),
+        })
+    return rows
+
+
+def bench_dynamic(maze, repeat=1, memory=True):
+    """Time a_star_with_dynamic_changes in every planning mode."""
+    grid, start, goal, _, dynamic_walls = maze
+    rows = []
+    for mode in PLANNING_MODES:
+        planners = []
+
+        def run():
+            # Walls are placed on the grid, so every run starts from a fresh copy
+            planners.append(AStar(grid.copy(), start, goal))
+            return planners[-1].a_star_with_dynamic_changes(dynamic_walls, set(), mode=mode)
+
+        seconds, peak, path = measure(run, repeat, memory)
+        planner = planners[0]
+        rows.append({
+            'case': f'a_star_with_dynamic_changes[{mode}]',
+            'seconds': seconds,
+            'peak_bytes': peak,
+            'expanded_nodes': planner.expanded_nodes,
+            'nodes_per_second': planner.expanded_nodes / seconds if seconds else None,
+            'replans': planner.replans,
+            'walls_placed': len(planner.triggers.events),
+            'path_length': None if path is None else len(path),
+        })
+    return rows
+
+
+def bench_batch(maze, queries=200, seed=0, repeat=1, memory=True):
+    """Time PathService.find_paths on queries from random open cells to the goal."""
+    grid, _, goal, _, _ = maze
+    open_cells = np.argwhere(grid != 1)
+    picks = np.random.default_rng(seed).choice(len(open_cells), size=queries)
+    batch = [(tuple(cell), goal) for cell in open_cells[picks].tolist()]
+    # A fresh service per run, so every run builds the goal tree
+    seconds, peak, paths = measure(lambda: PathService(grid).find_paths(batch), repeat, memory)
+    return [{
+        'case': 'PathService.find_paths',
+        'seconds': seconds,
+        'peak_bytes': peak,
+        'queries': queries,
+        'queries_per_second': queries / seconds if seconds else None,
+        'paths_found': sum(path is not None for path in paths),
+    }]
+
+
+def bench_train(maze, episodes, q_backend='array', seed=0, repeat=1, memory=True, find_path=True):
+    """Time MazeRunner.train, and find_path on the trained runner."""
+    grid, start, goal, grievers, dynamic_walls = maze
+    runners = []
+
+    def run():
+        runner = MazeRunner(grid, start, goal, q_backend=q_backend, seed=seed)
+        runner.initialize_q_table()
+        runners.append((runner, runner.train(episodes, dynamic_walls, grievers)))
+        return runner
+
+    seconds, peak, runner = measure(run, repeat, memory)
+    metrics = runners[0][1]
+    steps = int(metrics['steps'].sum())
+    rows = [{
+        'case': f'train[{q_backend}]',
+        'seconds': seconds,
+        'peak_bytes': peak,
+        'episodes': episodes,
+        'episodes_per_second': episodes / seconds if seconds else None,
+        'steps_per_second': steps / seconds if seconds else None,
+        'success_count': int(metrics['reached_goal'].sum()),
+    }]
+    if find_path:
+        seconds, peak, path = measure(runner.find_path, repeat, memory)
+        rows.append({
+            'case': 'find_path',
+            'seconds': seconds,
+            'peak_bytes': peak,
+            'path_length': len(path) if isinstance(path, list) else None,
+        })
+    return rows
+
+
+def bench_grievers(size, wall_density, triggers, episodes, q_backend='array', seed=0, repeat=1, memory=True):
+    """Time GrieverSwarm.tick and MazeRunner.train with a few grievers, as in the repo's mazes."""
+    rows = []
+    for count in GRIEVER_COUNTS:
+        maze = random_maze(size, wall_density, count, triggers, seed)
+        grid, _, _, grievers, _ = maze
+        ticks = 1000
+
+        def run():
+            board = grid.copy()
+            swarm = GrieverSwarm(grievers, board.shape, seed=seed)
+            for _ in range(ticks):
+                swarm.tick(board)
+
+        seconds, peak, _ = measure(run, repeat, memory)
+        rows.append({
+            'case': f'GrieverSwarm.tick[{count}]',
+            'seconds': seconds,
+            'peak_bytes': peak,
+            'ticks_per_second': ticks / seconds if seconds else None,
+        })
+        train_row = bench_train(maze, episodes, q_backend, seed, repeat, memory, find_path=False)[0]
+        rows.append({**train_row, 'case': f'train[{q_backend}, grievers={count}]'})
+    return rows
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, suites=SUITES, wall_density=0.25, grievers=4, triggers=4, episodes=50,
+                   q_backend='array', seed=0, repeat=1, memory=True):
+    """Run the selected suites on one random maze per size and return a list of result rows."""
+    rows = []
+    for size in sizes:
+        maze = random_maze(size, wall_density, grievers, triggers, seed)
+        params = {'size': size, 'wall_density': wall_density, 'grievers': grievers, 'triggers': triggers, 'seed': seed}
+        suite_rows = []
+        if 'astar' in suites:
+            suite_rows += bench_astar(maze, repeat, memory)
+        if 'dynamic' in suites:
+            suite_rows += bench_dynamic(maze, repeat, memory)
+        if 'batch' in suites:
+            suite_rows += bench_batch(maze, seed=seed, repeat=repeat, memory=memory)
+        if 'train' in suites or 'find_path' in suites:
+            # find_path needs a trained runner, so it always trains first
+            train_rows = bench_train(maze, episodes, q_backend, seed, repeat, memory, 'find_path' in suites)
+            suite_rows += [row for row in train_rows if 'train' in suites or row['case'] == 'find_path']
+        if 'grievers' in suites:
+            suite_rows += bench_grievers(size, wall_density, triggers, episodes, q_backend, seed, repeat, memory)
+        for row in suite_rows:
+            log.info("%dx%d %s: %.4fs", size, size, row['case'], row['seconds'])
+            rows.append({**params, **row})
+    return rows
+
+
+def git_commit():
+    """Current git commit of the working tree, or None outside a repository."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(rows, path):
+    """Write result rows plus the environment they were measured in as JSON."""
+    report = {
+        'commit': git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': rows,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def compare_results(baseline_path, rows):
+    """Print the time of every case relative to the same case in a baseline file."""
+    with open(baseline_path) as f:
+        baseline = {(row['size'], row['case']): row for row in json.load(f)['results']}
+    for row in rows:
+        old = baseline.get((row['size'], row['case']))
+        if old and old['seconds']:
+            print(f"{row['size']:>5} {row['case']:<42} {row['seconds'] / old['seconds']:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the planners and learners on seeded random mazes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Maze side lengths")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--wall-density", type=float, default=0.25)
+    parser.add_argument("--grievers", type=int, default=4)
+    parser.add_argument("--triggers", type=int, default=4)
+    parser.add_argument("--episodes", type=int, default=50, help="Training episodes per maze")
+    parser.add_argument("--backend", choices=("dict", "array"), default="array", help="Q-table backend")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per case; the best is kept")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the extra traced run for peak memory")
+    parser.add_argument("--out", default="benchmark.json", help="JSON file for the results")
+    parser.add_argument("--compare", default=None, help="Baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    configure_logging(verbosity=1)
+    rows = run_benchmarks(
+        args.sizes, args.suites, args.wall_density, args.grievers, args.triggers, args.episodes,
+        args.backend, args.seed, args.repeat, not args.no_memory,
+    )
+    write_results(rows, args.out)
+    if args.compare:
+        compare_results(args.compare, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import json
+import os
+
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+
+
+def q_table_array(runner):
+    """The runner's Q-table as a dense (rows, cols, 4) array plus a mask of the states it holds.
+
+    The dict backend only holds the states it has seen, and that matters for
+    has_state, so the mask keeps track of which dict entries exist.
+    """
+    shape = runner.maze.shape
+    if runner.q_backend == 'array':
+        if runner.q_table is None:
+            return np.zeros((*shape, len(runner.actions))), np.zeros(shape, dtype=bool)
+        return runner.q_table, np.ones(shape, dtype=bool)
+    q_values = np.zeros((*shape, len(runner.actions)))
+    known = np.zeros(shape, dtype=bool)
+    for state, values in runner.q_table.items():
+        q_values[state] = [values[action] for action in runner.actions]
+        known[state] = True
+    return q_values, known
+
+
+def rng_state(runner):
+    """Both of the runner's RNG states as a JSON string."""
+    version, internal, gauss_next = runner.rng.getstate()
+    return json.dumps({
+        'random': [version, list(internal), gauss_next],
+        'numpy': runner.np_rng.bit_generator.state,
+    })
+
+
+def set_rng_state(runner, state):
+    """Restore RNG states saved by rng_state."""
+    state = json.loads(state)
+    version, internal, gauss_next = state['random']
+    runner.rng.setstate((version, tuple(internal), gauss_next))
+    runner.np_rng.bit_generator.state = state['numpy']
+
+
+def save_checkpoint(runner, path, episodes_done, episodes=None):
+    """Write the Q-table, hyperparameters and RNG state to a compressed .npz file.
+
+    The file is written next to path first and then renamed over it, so a run killed
+    while saving still leaves the previous checkpoint intact.
+    """
+    q_values, known = q_table_array(runner)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            version=CHECKPOINT_VERSION,
+            q_values=q_values,
+            known=known,
+            q_backend=runner.q_backend,
+            start=np.array(runner.start, dtype=np.int64),
+            goal=np.array(runner.goal, dtype=np.int64),
+            alpha=runner.alpha,
+            gamma=runner.gamma,
+            episodes_done=episodes_done,
+            episodes=-1 if episodes is None else episodes,
+            rng_state=rng_state(runner),
+        )
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(runner, path):
+    """Restore a checkpoint written by save_checkpoint into runner.
+
+    The runner must be built for the same maze, start and goal. Its Q-table backend
+    may differ from the one that was saved. Returns (episodes_done, episodes), where
+    episodes is None if the checkpoint did not record a target.
+    """
+    with np.load(path) as data:
+        if int(data['version']) != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {int(data['version'])} in {path}")
+        q_values = data['q_values']
+        known = data['known']
+        if q_values.shape[:2] != runner.maze.shape:
+            raise ValueError(f"Checkpoint {path} is for a {q_values.shape[:2]} maze, not {runner.maze.shape}")
+        if tuple(data['start'].tolist()) != tuple(runner.start) or tuple(data['goal'].tolist()) != tuple(runner.goal):
+            raise ValueError(f"Checkpoint {path} was trained for a different start or goal")
+
+        if runner.q_backend == 'array':
+            runner.q_table = q_values.copy()
+        else:
+            runner.q_table = {
+                (i, j): dict(zip(runner.actions, q_values[i, j].tolist()))
+                for i, j in map(tuple, np.argwhere(known).tolist())
+            }
+        runner.alpha = float(data['alpha'])
+        runner.gamma = float(data['gamma'])
+        set_rng_state(runner, str(data['rng_state']))
+        episodes = int(data['episodes'])
+        return int(data['episodes_done']), None if episodes < 0 else episodes
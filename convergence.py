@@ -0,0 +1,80 @@
+import logging
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class ConvergenceMonitor:
+    """Decides when MazeRunner.train can stop before running every episode.
+
+    After each episode, train reports whether the goal was reached and the largest
+    Q-value change of that episode. Every path_every episodes the monitor also walks
+    the greedy path. Training stops once all enabled criteria hold:
+
+    - at least min_success_rate of the last window episodes reached the goal,
+    - no Q-value changed by more than max_q_delta in the last window episodes,
+    - the greedy path reached the goal with the same length path_patience checks in a row.
+
+    Set a criterion to None to disable it. Nothing stops before min_episodes.
+    """
+
+    def __init__(self, window=100, min_success_rate=0.95, max_q_delta=None, path_every=50, path_patience=3,
+                 min_episodes=0):
+        self.window = window
+        self.min_success_rate = min_success_rate
+        self.max_q_delta = max_q_delta
+        self.path_every = path_every
+        self.path_patience = path_patience
+        self.min_episodes = min_episodes
+        # Ring buffers over the last window episodes
+        self.successes = np.zeros(window, dtype=bool)
+        self.q_deltas = np.zeros(window)
+        self.seen = 0  # Episodes observed
+        self.path_length = None  # Length of the last greedy path, None if it failed
+        self.stable_checks = 0  # Consecutive greedy-path checks with the same length
+        self.converged_at = None  # Episodes used when the criteria were first met
+
+    @property
+    def converged(self):
+        return self.converged_at is not None
+
+    def success_rate(self):
+        """Share of the last window episodes (or fewer, early on) that reached the goal."""
+        count = min(self.seen, self.window)
+        return self.successes[:count].mean() if count else 0.0
+
+    def update(self, runner, episode, reached_goal, q_delta):
+        """Record one finished episode. Returns True when training should stop."""
+        slot = self.seen % self.window
+        self.successes[slot] = reached_goal
+        self.q_deltas[slot] = q_delta
+        self.seen += 1
+
+        if self.path_patience is not None and self.seen % self.path_every == 0:
+            path, _ = runner.greedy_path()
+            length = None if path is None else len(path)
+            if length is not None and length == self.path_length:
+                self.stable_checks += 1
+            else:
+                self.stable_checks = 0
+            self.path_length = length
+
+        if self.seen < max(self.min_episodes, self.window) or not self.criteria_met():
+            return False
+        self.converged_at = episode + 1
+        log.info(
+            "Converged after %d episodes: success rate %.2f, max Q-delta %.4g, greedy path length %s",
+            self.converged_at, self.success_rate(), self.q_deltas.max(), self.path_length,
+        )
+        return True
+
+    def criteria_met(self):
+        """Check every enabled criterion against the current window."""
+        if self.min_success_rate is not None and self.success_rate() < self.min_success_rate:
+            return False
+        if self.max_q_delta is not None and self.q_deltas.max() > self.max_q_delta:
+            return False
+        if self.path_patience is not None and self.stable_checks < self.path_patience:
+            return False
+        return True
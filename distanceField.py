@@ -0,0 +1,131 @@
+import heapq
+from collections import deque
+
+import numpy as np
+
+UNREACHABLE = -1  # Distance stored for walls and cells with no path to the goal
+
+
+class GoalDistanceField:
+    """Exact walking distance from every cell to the goal, from one reverse BFS.
+
+    The field is shared by AStar (as a perfect heuristic) and MazeRunner (for reward
+    shaping). When dynamic walls appear, update_walls repairs only the cells whose
+    distance depended on the new walls, and version changes only if a distance did.
+    """
+
+    def __init__(self, maze, goal):
+        self.maze = maze  # Shared with the caller; report new walls with update_walls
+        self.goal = goal
+        self.rows, self.cols = maze.shape
+        self.distances = np.full(maze.shape, UNREACHABLE, dtype=np.int32)
+        self.version = 0
+        self.undo = {}  # Distance of every cell before update_walls changed it, see restore
+        self.recompute()
+
+    def recompute(self):
+        """Rebuild the whole field with a BFS from the goal."""
+        self.undo = {}
+        self.distances.fill(UNREACHABLE)
+        flat = self.distances.reshape(-1)
+        passable = (self.maze != 1).reshape(-1)
+        goal = self.goal[0] * self.cols + self.goal[1]
+        if passable[goal]:
+            flat[goal] = 0
+            queue = deque([goal])
+            while queue:
+                cell = queue.popleft()
+                d = flat[cell] + 1
+                for n in self.neighbors(cell):
+                    if passable[n] and flat[n] == UNREACHABLE:
+                        flat[n] = d
+                        queue.append(n)
+        self.version += 1
+
+    def neighbors(self, cell):
+        """Flat indices of the in-bounds neighbors of a flat cell index."""
+        x, y = divmod(cell, self.cols)
+        if x > 0:
+            yield cell - self.cols
+        if x < self.rows - 1:
+            yield cell + self.cols
+        if y > 0:
+            yield cell - 1
+        if y < self.cols - 1:
+            yield cell + 1
+
+    def distance(self, cell):
+        """Distance from an (x, y) cell to the goal, or UNREACHABLE."""
+        return int(self.distances[cell])
+
+    def update_walls(self, cells):
+        """Repair the field after walls were placed at the given (x, y) cells.
+
+        Returns the cells whose distance changed. Walls on cells that were already
+        unreachable change nothing.
+        """
+        flat = self.distances.reshape(-1)
+        walls = set()
+        old = {}  # Previous distance of every invalidated cell
+        pending = []  # Heap of (old distance, cell) still to check for support
+
+        for x, y in cells:
+            wall = x * self.cols + y
+            walls.add(wall)
+            if flat[wall] == UNREACHABLE:
+                continue
+            old[wall] = int(flat[wall])
+            flat[wall] = UNREACHABLE
+            for n in self.neighbors(wall):
+                if flat[n] == old[wall] + 1:
+                    heapq.heappush(pending, (old[wall] + 1, n))
+
+        # A cell keeps its distance d if a neighbor still sits at d - 1. Checking in
+        # order of distance means every neighbor at d - 1 has already been decided.
+        while pending:
+            d, cell = heapq.heappop(pending)
+            if cell in old or flat[cell] != d:
+                continue
+            if any(flat[n] == d - 1 for n in self.neighbors(cell)):
+                continue
+            old[cell] = d
+            flat[cell] = UNREACHABLE
+            for n in self.neighbors(cell):
+                if flat[n] == d + 1:
+                    heapq.heappush(pending, (d + 1, n))
+
+        # Settle invalidated cells again outward from the ones next to intact distances
+        frontier = []
+        for cell in old:
+            if cell not in walls:
+                best = min((int(flat[n]) for n in self.neighbors(cell) if flat[n] != UNREACHABLE), default=None)
+                if best is not None:
+                    heapq.heappush(frontier, (best + 1, cell))
+        while frontier:
+            d, cell = heapq.heappop(frontier)
+            if flat[cell] != UNREACHABLE:
+                continue
+            flat[cell] = d
+            for n in self.neighbors(cell):
+                if n in old and n not in walls and flat[n] == UNREACHABLE:
+                    heapq.heappush(frontier, (d + 1, n))
+
+        changed = [divmod(cell, self.cols) for cell, d in old.items() if flat[cell] != d]
+        for cell in changed:
+            self.undo.setdefault(cell, old[cell[0] * self.cols + cell[1]])
+        if changed:
+            self.version += 1
+        return changed
+
+    def restore(self):
+        """Undo every update_walls change since the last restore, once the walls are gone.
+
+        Returns the cells whose distance was restored.
+        """
+        restored = list(self.undo)
+        for cell, distance in self.undo.items():
+            self.distances[cell] = distance
+        self.undo = {}
+        if restored:
+            self.version += 1
+        return restored
@@ -0,0 +1,53 @@
+import numpy as np
+
+from grievers import GrieverSwarm
+from mazeParser import TriggerIndex
+
+
+class MazeEnvironment:
+    """Copy-on-write view of a maze for independent training episodes.
+
+    base is a read-only copy of the maze given at construction and is never changed.
+    Dynamic walls and grievers change grid; the walls placed and the grievers' current
+    cells are known, so reset() restores only those cells instead of copying the whole
+    grid again. rng seeds the griever moves.
+    """
+
+    def __init__(self, maze, dynamic_walls, grievers, rng=None):
+        self.base = np.array(maze, copy=True)
+        self.base.flags.writeable = False
+        self.grid = self.base.copy()
+        self.triggers = TriggerIndex(dynamic_walls)
+        self.grievers = GrieverSwarm(grievers, self.grid.shape, rng=rng)
+        self.changed = set()  # Cells of grid changed by dynamic walls
+        self.placed_walls = []  # Walls placed since the last reset
+
+    def visit(self, cell, placed_walls=None, step=None):
+        """Fire the dynamic-wall trigger at cell, if any. Returns the number of walls placed."""
+        placed = []
+        count = self.triggers.visit(self.grid, cell, placed, step)
+        if count:
+            self.changed.update(placed)
+            self.placed_walls.extend(placed)
+            if placed_walls is not None:
+                placed_walls.extend(placed)
+        return count
+
+    def move_grievers(self):
+        """Advance every griever one step on grid and return the swarm.
+
+        The swarm supports `cell in swarm` in O(1) through its occupancy grid; call
+        positions() when a list of coordinates is needed.
+        """
+        self.grievers.tick(self.grid)
+        return self.grievers
+
+    def reset(self):
+        """Undo this episode's changes in O(changes). Returns the walls that were removed."""
+        for cell in self.changed:
+            self.grid[cell] = self.base[cell]
+        self.changed.clear()
+        self.triggers.rearm()
+        self.grievers.reset(self.grid, self.base)
+        removed, self.placed_walls = self.placed_walls, []
+        return removed
@@ -1,6 +1,9 @@
 import random
 
-def update_griever_positions(grievers, maze):
+import numpy as np
+
+
+def update_griever_positions(grievers, maze, rng=random):
     new_positions = []
     for griever in grievers:
         x, y = griever
@@ -12,7 +15,7 @@ def update_griever_positions(grievers, maze):
         
         if possible_moves:
             # Randomly choose between left and right
-            new_position = random.choice(possible_moves)
+            new_position = rng.choice(possible_moves)
             maze[x, y] = 0  # Clear old position
             maze[new_position] = -1  # Mark new position
             new_positions.append(new_position)
@@ -22,3 +25,137 @@ def update_griever_positions(grievers, maze):
     
     return new_positions
 
+
+
+VECTORIZE_ABOVE = 32  # Swarms larger than this move with NumPy masks, smaller ones cell by cell
+
+
+class GrieverSwarm:
+    """All grievers of a maze, moved together once per tick.
+
+    Each tick every griever picks left or right among the walkable (0) cells next to
+    it, like update_griever_positions, using a seeded numpy Generator. Grievers only
+    move into cells that were empty when the tick started; when several pick the same
+    cell, the one listed first gets it and the others stay put. occupied is a boolean
+    grid kept in sync with the moves, so "is a griever here?" is O(1).
+
+    Swarms of up to VECTORIZE_ABOVE grievers (the usual two to four) keep a list of
+    cells and a set, and move in a plain loop: a NumPy tick has a fixed cost of about
+    20 us, ten times the loop's for a few grievers, and training ticks on every step.
+    Larger swarms keep coordinate arrays and move with masks. Both draw the same
+    random numbers and follow the same rules, so the moves do not depend on the size.
+    """
+
+    def __init__(self, positions, shape, rng=None, seed=None):
+        positions = np.array(positions, dtype=np.int64).reshape(-1, 2)
+        self.start = [(int(x), int(y)) for x, y in positions.tolist()]
+        self.vectorized = len(self.start) > VECTORIZE_ABOVE
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+        self.occupied = np.zeros(shape, dtype=bool)
+        self.place_at_start()
+
+    def place_at_start(self):
+        if self.vectorized:
+            self._xs = np.array([x for x, _ in self.start], dtype=np.int64)
+            self._ys = np.array([y for _, y in self.start], dtype=np.int64)
+            self.occupied[self._xs, self._ys] = True
+        else:
+            self.cells = list(self.start)
+            self.cell_set = set(self.cells)
+            for cell in self.cells:
+                self.occupied[cell] = True
+
+    @property
+    def xs(self):
+        """Row of every griever, as an array."""
+        return self._xs if self.vectorized else np.array([x for x, _ in self.cells], dtype=np.int64)
+
+    @property
+    def ys(self):
+        """Column of every griever, as an array."""
+        return self._ys if self.vectorized else np.array([y for _, y in self.cells], dtype=np.int64)
+
+    def tick(self, maze):
+        """Move every griever one step and update its marker in maze."""
+        if self.vectorized:
+            self.tick_arrays(maze)
+        else:
+            self.tick_cells(maze)
+
+    def tick_cells(self, maze):
+        """tick() for small swarms, one griever at a time."""
+        cols = maze.shape[1]
+        draws = self.rng.random(len(self.cells)).tolist()
+        claimed = set()
+        moves = []
+        for i, (x, y) in enumerate(self.cells):
+            left_ok = y > 0 and maze[x, y - 1] == 0
+            right_ok = y < cols - 1 and maze[x, y + 1] == 0
+            if left_ok and right_ok:
+                target = (x, y + 1) if draws[i] < 0.5 else (x, y - 1)  # Randomly choose between left and right
+            elif left_ok or right_ok:
+                target = (x, y + 1) if right_ok else (x, y - 1)
+            else:
+                continue  # Stay in place if no valid moves
+            if target not in claimed:  # The first griever to claim a cell wins it
+                claimed.add(target)
+                moves.append((i, target))
+
+        for i, target in moves:
+            cell = self.cells[i]
+            maze[cell] = 0  # Clear old position
+            self.occupied[cell] = False
+            self.cell_set.discard(cell)
+            self.cells[i] = target
+        for _, target in moves:
+            maze[target] = -1  # Mark new position
+            self.occupied[target] = True
+            self.cell_set.add(target)
+
+    def tick_arrays(self, maze):
+        """tick() for large swarms, with NumPy masks over all grievers."""
+        cols = maze.shape[1]
+        xs, ys = self._xs, self._ys
+        left_ok = (ys > 0) & (maze[xs, np.maximum(ys - 1, 0)] == 0)
+        right_ok = (ys < cols - 1) & (maze[xs, np.minimum(ys + 1, cols - 1)] == 0)
+        # Randomly choose between left and right when both are open
+        go_right = np.where(left_ok & right_ok, self.rng.random(len(xs)) < 0.5, right_ok)
+        movers = np.flatnonzero(left_ok | right_ok)
+        targets = np.where(go_right[movers], ys[movers] + 1, ys[movers] - 1)
+
+        # The first griever to claim a cell wins it
+        _, first = np.unique(xs[movers] * cols + targets, return_index=True)
+        movers, targets = movers[first], targets[first]
+
+        maze[xs[movers], ys[movers]] = 0  # Clear old positions
+        self.occupied[xs[movers], ys[movers]] = False
+        ys[movers] = targets
+        maze[xs[movers], ys[movers]] = -1  # Mark new positions
+        self.occupied[xs[movers], ys[movers]] = True
+
+    def reset(self, maze, base):
+        """Put every griever back at its start, restoring the cells it left from base."""
+        xs, ys = self.xs, self.ys
+        maze[xs, ys] = base[xs, ys]
+        self.occupied[xs, ys] = False
+        self.place_at_start()
+        xs, ys = self.xs, self.ys
+        maze[xs, ys] = -1
+
+    def positions(self):
+        """Griever positions as a list of (x, y) tuples."""
+        if self.vectorized:
+            return list(zip(self._xs.tolist(), self._ys.tolist()))
+        return list(self.cells)
+
+    def __len__(self):
+        return len(self.start)
+
+    def __iter__(self):
+        return iter(self.positions())
+
+    def __contains__(self, cell):
+        if not self.vectorized:
+            return cell in self.cell_set
+        x, y = cell
+        return 0 <= x < self.occupied.shape[0] and 0 <= y < self.occupied.shape[1] and bool(self.occupied[x, y])
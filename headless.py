@@ -0,0 +1,141 @@
+import argparse
+import logging
+import os
+import sys
+
+from checkpoint import load_checkpoint, save_checkpoint
+from convergence import ConvergenceMonitor
+from mazeLogging import configure_logging
+from mazeParser import load_dynamic_walls, load_maze_grid, save_maze_image
+from qlearning import Q_BACKENDS, MazeRunner
+
+log = logging.getLogger(__name__)
+
+
+def build_runner(maze_file, q_backend='dict', seed=None, cache=False):
+    """Load a maze CSV and return a MazeRunner for it together with its grievers."""
+    maze_numeric, start, goal, grievers = load_maze_grid(maze_file, cache=cache)
+    if start is None or goal is None:
+        raise ValueError(f"Start ('S') or Goal ('E') position not defined in {maze_file}")
+    return MazeRunner(maze_numeric, start, goal, q_backend=q_backend, seed=seed), grievers
+
+
+def train(args):
+    runner, grievers = build_runner(args.maze, args.backend, args.seed, args.cache)
+    runner.alpha = args.alpha
+    runner.gamma = args.gamma
+    runner.initialize_q_table()
+    dynamic_walls = load_dynamic_walls(args.dynamic)
+
+    start_episode = 0
+    if args.checkpoint and args.resume and os.path.exists(args.checkpoint):
+        # Hyperparameters and RNG state come from the checkpoint, not the command line
+        start_episode, target = load_checkpoint(runner, args.checkpoint)
+        log.info("Resuming from %s after %d episodes", args.checkpoint, start_episode)
+        if start_episode >= min(args.episodes, target if target is not None else args.episodes):
+            log.info("Checkpoint %s is already complete, nothing to train", args.checkpoint)
+            return 0
+
+    convergence = None
+    if args.early_stop:
+        convergence = ConvergenceMonitor(
+            window=args.window, min_success_rate=args.min_success_rate, max_q_delta=args.max_q_delta,
+        )
+
+    checkpoint = None
+    if args.checkpoint:
+        runner.checkpoint_every = args.checkpoint_every
+
+        def checkpoint(episodes_done):
+            # A converged run is complete, so --resume must not train it further
+            target = episodes_done if convergence is not None and convergence.converged else args.episodes
+            save_checkpoint(runner, args.checkpoint, episodes_done, target)
+            log.info("Saved checkpoint %s after %d episodes", args.checkpoint, episodes_done)
+
+    metrics = runner.train(
+        args.episodes, dynamic_walls, grievers, start_episode=start_episode, checkpoint=checkpoint,
+        convergence=convergence,
+    )
+    if args.metrics:
+        if args.metrics.endswith(".parquet"):
+            metrics.to_parquet(args.metrics)
+        else:
+            metrics.to_csv(args.metrics)
+    print(f"Episodes used: {runner.episodes_trained}/{args.episodes}")
+    if args.show_path:
+        print("Path found by Q-Learning:", runner.find_path())
+    return 0
+
+
+def find_path(args):
+    runner, _ = build_runner(args.maze, args.backend, cache=args.cache)
+    episodes_done, _ = load_checkpoint(runner, args.checkpoint)
+    log.info("Loaded %s, trained for %d episodes", args.checkpoint, episodes_done)
+    path = runner.find_path()
+    print("Path found by Q-Learning:", path)
+    return 0 if isinstance(path, list) else 1
+
+
+def plot_maze(args):
+    maze_numeric, start, goal, _ = load_maze_grid(args.maze, cache=args.cache)
+    dynamic_walls = load_dynamic_walls(args.dynamic) if args.dynamic else None
+    paths = save_maze_image(
+        maze_numeric, args.out, dynamic_walls, start, goal, args.max_size, args.cell_pixels, args.tile,
+    )
+    log.info("Wrote %d image(s) of %s", len(paths), args.maze)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train Maze Runner agents and query their paths without a display.")
+    parser.add_argument("-v", "--verbose", action="count", default=1, help="More log output (repeat up to -vv)")
+    parser.add_argument("-q", "--quiet", action="store_const", const=0, dest="verbose", help="Only show warnings")
+    parser.add_argument("--backend", choices=Q_BACKENDS, default="dict", help="Q-table backend")
+    parser.add_argument("--cache", action="store_true", help="Cache the parsed maze next to the CSV")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = commands.add_parser("train", help="Train an agent, checkpointing as it goes")
+    train_parser.add_argument("maze", help="Maze CSV file")
+    train_parser.add_argument("dynamic", help="Dynamic walls file")
+    train_parser.add_argument("--episodes", type=int, default=10000, help="Total episodes, including resumed ones")
+    train_parser.add_argument("--alpha", type=float, default=0.01, help="Learning rate")
+    train_parser.add_argument("--gamma", type=float, default=0.9, help="Discount factor")
+    train_parser.add_argument("--seed", type=int, default=None, help="Seed for exploration and griever moves")
+    train_parser.add_argument("--checkpoint", default=None, help="Checkpoint file (.npz) to write")
+    train_parser.add_argument("--checkpoint-every", type=int, default=1000, help="Episodes between checkpoints")
+    train_parser.add_argument("--resume", action="store_true", help="Continue from --checkpoint if it exists")
+    train_parser.add_argument("--early-stop", action="store_true", help="Stop once training has converged")
+    train_parser.add_argument("--window", type=int, default=100, help="Episodes in the convergence window")
+    train_parser.add_argument(
+        "--min-success-rate", type=float, default=0.95, help="Share of window episodes that must reach the goal"
+    )
+    train_parser.add_argument(
+        "--max-q-delta", type=float, default=None, help="Largest Q-value change allowed in the window (default: off)"
+    )
+    train_parser.add_argument("--metrics", default=None, help="Write per-episode metrics to a .csv or .parquet file")
+    train_parser.add_argument("--show-path", action="store_true", help="Print the learned path when done")
+    train_parser.set_defaults(handler=train)
+
+    path_parser = commands.add_parser("path", help="Print the path learned in a checkpoint")
+    path_parser.add_argument("maze", help="Maze CSV file the checkpoint was trained on")
+    path_parser.add_argument("checkpoint", help="Checkpoint file (.npz)")
+    path_parser.set_defaults(handler=find_path)
+
+    plot_parser = commands.add_parser("plot", help="Save an overview image of a maze as PNG")
+    plot_parser.add_argument("maze", help="Maze CSV file")
+    plot_parser.add_argument("out", help="PNG file to write")
+    plot_parser.add_argument("--dynamic", default=None, help="Dynamic walls file; triggers are drawn in yellow")
+    plot_parser.add_argument("--max-size", type=int, default=4096, help="Downsample to at most this many cells a side")
+    plot_parser.add_argument("--cell-pixels", type=int, default=1, help="Pixels per cell side")
+    plot_parser.add_argument(
+        "--tile", type=int, default=None, help="Write full-resolution tiles of this many cells instead of one image"
+    )
+    plot_parser.set_defaults(handler=plot_maze)
+
+    args = parser.parse_args(argv)
+    configure_logging(verbosity=args.verbose)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
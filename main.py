@@ -1,16 +1,12 @@
-import numpy as np
-from mazeParser import load_maze, load_dynamic_walls, visualize_maze, visualize_maze_live
+import logging
+from mazeParser import load_maze, load_dynamic_walls, parse_maze_array, visualize_maze
+from mazeRenderer import visualize_maze_live
 from qlearning import MazeRunner
+from mazeLogging import configure_logging
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
-def parse_grievers(maze):
-    grievers = []
-    for i in range(maze.shape[0]):
-        for j in range(maze.shape[1]):
-            if maze[i, j] == -1:
-                grievers.append((i, j))
-    return grievers
+log = logging.getLogger(__name__)
 
 class FileSelectorApp:
     def __init__(self, root):
@@ -69,43 +65,32 @@ class FileSelectorApp:
         try:
             maze = load_maze(self.maze_file)
             dynamic_walls = load_dynamic_walls(self.dynamic_file)
-            print("dynamic_walls:", dynamic_walls)
+            log.debug("Dynamic walls: %s", dynamic_walls)
 
             # visualize_maze(maze, dynamic_walls)
 
-            start = None
-            goal = None
-            for i in range(maze.shape[0]):
-                for j in range(maze.shape[1]):
-                    if maze[i, j] == 'S':
-                        start = (i, j)
-                    if maze[i, j] == 'E':
-                        goal = (i, j)
+            maze_numeric, start, goal, grievers = parse_maze_array(maze)
 
             if start is None or goal is None:
                 messagebox.showerror("Error", "Start ('S') or Goal ('E') position not defined in the maze.")
-                print("Error: Start ('S') or Goal ('E') position not defined in the maze.")
+                log.error("Start ('S') or Goal ('E') position not defined in %s", self.maze_file)
                 return
 
-            maze_numeric = np.where(maze == 'S', 0, maze)
-            maze_numeric = np.where(maze_numeric == 'E', 0, maze_numeric)
-            maze_numeric = np.where(maze_numeric == 'G', -1, maze_numeric)
-
-            print("Maze:" + str(maze_numeric))
-            grievers = parse_grievers(maze_numeric)
-            print("Grievers:", grievers)
-            runner = MazeRunner(maze_numeric.astype(int), start, goal)
+            log.debug("Maze:\n%s", maze_numeric)
+            log.debug("Grievers: %s", grievers)
+            runner = MazeRunner(maze_numeric, start, goal)
             runner.initialize_q_table()
             runner.train(episodes=10000, dynamic_walls=dynamic_walls, grievers=grievers)
             path = runner.find_path()
-            print("Path found by Q-Learning:", path)
+            log.info("Path found by Q-Learning: %s", path)
             # Visualize the maze with the Q-Learning path
             visualize_maze_live(maze, path, dynamic_walls, grievers)
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
-            print(e)
+            log.exception("Simulation failed")
 
 def main():
+    configure_logging(verbosity=1)
     root = tk.Tk()
     app = FileSelectorApp(root)
     root.mainloop()
@@ -0,0 +1,198 @@
+import argparse
+import logging
+import os
+import sys
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from astar import AStar
+from checkpoint import load_checkpoint
+from grievers import GrieverSwarm
+from mazeLogging import configure_logging
+from mazeParser import FPS, MARGIN, TILE_NAMES, MazeScene, TriggerIndex, load_dynamic_walls, load_maze_grid
+from qlearning import MazeRunner
+from tileAtlas import load_tile_atlas
+
+log = logging.getLogger(__name__)
+
+
+def gif_palette(tiles):
+    """A 256-colour palette image for GIF frames built from the given tiles.
+
+    Every frame is made of tile pixels plus the black margins and the red and
+    white banner, so one palette serves all frames and each frame is only mapped
+    onto it instead of being quantized on its own.
+    """
+    swatch = np.zeros((len(tiles) + 1, *tiles.shape[1:]), dtype=np.uint8)
+    swatch[:-1] = tiles
+    swatch[-1, 0] = (255, 0, 0)  # Banner box
+    swatch[-1, 1] = (255, 255, 255)  # Banner text
+    return Image.fromarray(swatch.reshape(-1, *tiles.shape[2:])).quantize(256, method=Image.Quantize.MEDIANCUT)
+
+
+class FrameCompositor(MazeScene):
+    """Composes animation frames as NumPy arrays, with no display or pygame.
+
+    frame is a (rows, pitch, cols, pitch, 3) view of the image, where pitch is the
+    cell size plus the margin, so a cell is one slice assignment. Like LiveMazeView,
+    only the cells a step changes are rewritten, and placed walls are written into
+    the background once.
+    """
+
+    def __init__(self, maze, tiles, triggers, swarm, start=None, goal=None, margin=MARGIN):
+        super().__init__(maze, triggers, swarm, start, goal)
+        self.tiles = tiles
+        self.cell_size = tiles.shape[1]
+        rows, cols = self.background_tiles.shape
+        pitch = self.cell_size + margin
+        self.background = np.zeros((rows, pitch, cols, pitch, 3), dtype=np.uint8)  # Black margins
+        self.background[:, :self.cell_size, :, :self.cell_size] = tiles[self.background_tiles].transpose(0, 2, 1, 3, 4)
+        self.frame = self.background.copy()
+        self.image = self.frame.reshape(rows * pitch, cols * pitch, 3)  # Same memory as frame
+
+    def draw_cell(self, cell):
+        i, j = cell
+        name = self.overlay(cell)
+        if name is None:
+            self.frame[i, :, j] = self.background[i, :, j]
+        else:
+            self.frame[i, :self.cell_size, j, :self.cell_size] = self.tiles[TILE_NAMES.index(name)]
+
+    def draw_all(self):
+        """Draw the whole maze; used for the first frame."""
+        self.frame[...] = self.background
+        for cell in self.overlay_cells():
+            self.draw_cell(cell)
+
+    def step(self, step, cell):
+        placed, dirty = super().step(step, cell)
+        for i, j in placed:
+            self.background[i, :self.cell_size, j, :self.cell_size] = self.tiles[TILE_NAMES.index('wall')]
+        return placed, dirty
+
+    def redraw(self, cells):
+        for cell in cells:
+            self.draw_cell(cell)
+
+
+def draw_banner(image, text):
+    """Draw a message in white on a red box in the middle of an RGB array, in place."""
+    canvas = Image.fromarray(image)
+    draw = ImageDraw.Draw(canvas)
+    height, width = image.shape[:2]
+    font = ImageFont.load_default(size=max(12, min(48, width // (len(text) + 2))))
+    left, top, right, bottom = draw.textbbox((width // 2, height // 2), text, font=font, anchor="mm")
+    draw.rectangle((left - 10, top - 10, right + 10, bottom + 10), fill=(255, 0, 0))  # Red background
+    draw.text((width // 2, height // 2), text, font=font, fill=(255, 255, 255), anchor="mm")
+    image[...] = np.asarray(canvas)
+
+
+def render_frames(maze, path, dynamic_walls=None, grievers=None, cell_size=16, seed=None, start=None, goal=None):
+    """Yield the frames of visualize_maze_live as (height, width, 3) uint8 arrays.
+
+    maze is anything visualize_maze_live accepts, or a numeric grid with start and
+    goal given separately. It is copied, not modified. The first frame shows the
+    maze, then one frame per path step, then the highlighted path with a banner.
+    Every frame is the same array updated in place; copy it to keep it.
+    """
+    maze = np.array(maze)
+    triggers = TriggerIndex(dynamic_walls or {})
+    swarm = GrieverSwarm(grievers or [], maze.shape, seed=seed)
+    scene = FrameCompositor(maze, load_tile_atlas(cell_size), triggers, swarm, start, goal)
+
+    scene.draw_all()
+    if isinstance(path, str):  # "No path found."
+        draw_banner(scene.image, "NO PATH FOUND")
+        yield scene.image
+        return
+
+    yield scene.image
+    for step, cell in enumerate(path):
+        _, dirty = scene.step(step, tuple(cell))
+        scene.redraw(dirty)
+        yield scene.image
+
+    scene.redraw(scene.finish([tuple(cell) for cell in path]))
+    draw_banner(scene.image, "SUCCESSFUL EXIT!")
+    yield scene.image
+
+
+def write_frames(frames, out, fps=FPS, palette=None):
+    """Write frames to a .gif, an .mp4 (needs imageio with ffmpeg) or a directory of PNGs.
+
+    GIF frames are mapped onto palette (see gif_palette), or onto a palette taken
+    from the first frame. Returns the number of frames written.
+    """
+    extension = os.path.splitext(out)[1].lower()
+    count = 0
+    if extension == ".gif":
+        images = []
+        for frame in frames:
+            image = Image.fromarray(frame)  # Copies the frame
+            if palette is None:
+                palette = image.quantize(256, method=Image.Quantize.MEDIANCUT)
+            images.append(image.quantize(palette=palette, dither=Image.Dither.NONE))
+        # Pillow's optimize pass makes smaller files but takes about ten times longer to write
+        images[0].save(out, save_all=True, append_images=images[1:], duration=1000 / fps, loop=0, optimize=False)
+        count = len(images)
+    elif extension == ".mp4":
+        try:
+            import imageio
+        except ImportError:
+            raise ImportError("Writing .mp4 files needs imageio and imageio-ffmpeg: pip install imageio imageio-ffmpeg")
+        # Most players need even frame sizes, which imageio gets by padding; keep the tile grid unscaled
+        with imageio.get_writer(out, fps=fps, macro_block_size=1) as writer:
+            for frame in frames:
+                writer.append_data(frame)
+                count += 1
+    elif extension == "":
+        os.makedirs(out, exist_ok=True)
+        for frame in frames:
+            Image.fromarray(frame).save(os.path.join(out, f"frame_{count:05d}.png"))
+            count += 1
+    else:
+        raise ValueError(f"Unsupported output {out}: use .gif, .mp4 or a directory name")
+    return count
+
+
+def export_simulation(out, maze, path, dynamic_walls=None, grievers=None, cell_size=16, fps=FPS, seed=None,
+                      start=None, goal=None):
+    """Render the path animation to a file without opening a window. Returns the number of frames."""
+    frames = render_frames(maze, path, dynamic_walls, grievers, cell_size, seed, start, goal)
+    return write_frames(frames, out, fps, gif_palette(load_tile_atlas(cell_size)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the maze path animation to a GIF, MP4 or PNG frames.")
+    parser.add_argument("maze", help="Maze CSV file")
+    parser.add_argument("out", help="Output .gif, .mp4, or a directory for PNG frames")
+    parser.add_argument("--dynamic", default=None, help="Dynamic walls file")
+    parser.add_argument("--checkpoint", default=None, help="Animate the path learned in this checkpoint (default: A*)")
+    parser.add_argument("--cell-size", type=int, default=16, help="Pixels per cell")
+    parser.add_argument("--fps", type=float, default=FPS, help="Frames per second")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for griever moves")
+    args = parser.parse_args(argv)
+    configure_logging(verbosity=1)
+
+    grid, start, goal, grievers = load_maze_grid(args.maze)
+    if start is None or goal is None:
+        raise ValueError(f"Start ('S') or Goal ('E') position not defined in {args.maze}")
+    dynamic_walls = load_dynamic_walls(args.dynamic) if args.dynamic else {}
+
+    if args.checkpoint:
+        runner = MazeRunner(grid, start, goal)
+        load_checkpoint(runner, args.checkpoint)
+        path = runner.find_path()
+    else:
+        path = AStar(grid, start, goal).a_star_search(method='grid') or "No path found."
+
+    count = export_simulation(
+        args.out, grid, path, dynamic_walls, grievers, args.cell_size, args.fps, args.seed, start, goal,
+    )
+    log.info("Wrote %d frames to %s", count, args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
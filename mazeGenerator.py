@@ -0,0 +1,268 @@
+import argparse
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+from distanceField import GoalDistanceField, UNREACHABLE
+from mazeLogging import configure_logging
+from mazeParser import save_maze_cache
+
+log = logging.getLogger(__name__)
+
+GENERATORS = ('backtracker', 'prim', 'rooms')
+
+# A generated maze in the form load_maze_grid returns, plus its dynamic walls
+GeneratedMaze = namedtuple('GeneratedMaze', 'grid start goal grievers dynamic_walls')
+
+# Lattice steps between neighboring cells of a perfect maze: up, down, left, right
+LATTICE_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# Grid code + 1 -> CSV character; start and goal are written over the grid afterwards
+CSV_CHARS = np.frombuffer(b'G01', dtype=np.uint8)
+
+
+def generate_maze(rows, cols, method='backtracker', seed=None, grievers=0, triggers=0, loops=0.0, rooms=None):
+    """Generate a rows x cols maze, deterministic for a given seed.
+
+    'backtracker' (recursive backtracker, long winding corridors) and 'prim'
+    (randomized Prim's, many short dead ends) carve a perfect maze on the cells with
+    even coordinates. loops then removes that share of the remaining walls between
+    two cells to add cycles. 'rooms' places up to rooms rectangular rooms and joins
+    them with corridors. The start and goal are opposite corners, or the first and
+    last room.
+
+    grievers are placed on random open cells. Every trigger sits on a shortest path
+    from start to goal and places one wall on a random open cell elsewhere.
+    """
+    if method not in GENERATORS:
+        raise ValueError(f"Unknown maze generator {method!r}, expected one of {GENERATORS}")
+    if rows < 1 or cols < 1:
+        raise ValueError(f"Maze size must be positive, got {rows}x{cols}")
+    rng = np.random.default_rng(seed)
+    grid = np.ones((rows, cols), dtype=np.int8)
+    if method == 'rooms':
+        start, goal = carve_rooms(grid, rng, rooms, loops)
+    else:
+        carve = carve_backtracker if method == 'backtracker' else carve_prim
+        carve(grid, rng)
+        if loops:
+            remove_walls(grid, rng, loops)
+        start, goal = (0, 0), ((rows - 1) // 2 * 2, (cols - 1) // 2 * 2)
+    if start == goal:
+        raise ValueError(f"A {rows}x{cols} {method} maze is too small to separate start and goal")
+
+    griever_cells = place_grievers(grid, rng, grievers, (start, goal))
+    dynamic_walls = place_triggers(grid, rng, triggers, start, goal) if triggers else {}
+    return GeneratedMaze(grid, start, goal, griever_cells, dynamic_walls)
+
+
+def carve_backtracker(grid, rng):
+    """Carve a perfect maze with an iterative recursive backtracker."""
+    height, width = (grid.shape[0] + 1) // 2, (grid.shape[1] + 1) // 2
+    visited = np.zeros((height, width), dtype=bool)
+    draws = iter(rng.random(height * width).tolist())  # One draw per carved passage
+    visited[0, 0] = True
+    grid[0, 0] = 0
+    stack = [(0, 0)]
+    while stack:
+        x, y = stack[-1]
+        options = [
+            (x + dx, y + dy) for dx, dy in LATTICE_STEPS
+            if 0 <= x + dx < height and 0 <= y + dy < width and not visited[x + dx, y + dy]
+        ]
+        if not options:
+            stack.pop()
+            continue
+        nx, ny = options[int(next(draws) * len(options))]
+        visited[nx, ny] = True
+        grid[x + nx, y + ny] = 0  # The wall between the two cells
+        grid[2 * nx, 2 * ny] = 0
+        stack.append((nx, ny))
+
+
+def carve_prim(grid, rng):
+    """Carve a perfect maze with randomized Prim's algorithm."""
+    height, width = (grid.shape[0] + 1) // 2, (grid.shape[1] + 1) // 2
+    in_maze = np.zeros((height, width), dtype=bool)
+    in_frontier = np.zeros((height, width), dtype=bool)
+    draws = iter(rng.random(2 * height * width).tolist())  # Frontier pick and neighbor pick per cell
+    frontier = []
+
+    def add(x, y):
+        in_maze[x, y] = True
+        grid[2 * x, 2 * y] = 0
+        for dx, dy in LATTICE_STEPS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < height and 0 <= ny < width and not in_maze[nx, ny] and not in_frontier[nx, ny]:
+                in_frontier[nx, ny] = True
+                frontier.append((nx, ny))
+
+    add(0, 0)
+    while frontier:
+        # Swap-remove a random frontier cell
+        i = int(next(draws) * len(frontier))
+        frontier[i], frontier[-1] = frontier[-1], frontier[i]
+        x, y = frontier.pop()
+        in_frontier[x, y] = False
+        links = [
+            (x + dx, y + dy) for dx, dy in LATTICE_STEPS
+            if 0 <= x + dx < height and 0 <= y + dy < width and in_maze[x + dx, y + dy]
+        ]
+        nx, ny = links[int(next(draws) * len(links))]
+        grid[x + nx, y + ny] = 0
+        add(x, y)
+
+
+def remove_walls(grid, rng, share):
+    """Open the given share of walls that separate two carved lattice cells."""
+    rows, cols = grid.shape
+    candidates = np.zeros(grid.shape, dtype=bool)
+    candidates[1:rows - 1:2, 0::2] = True  # Between vertically adjacent cells
+    candidates[0::2, 1:cols - 1:2] = True  # Between horizontally adjacent cells
+    walls = np.flatnonzero(candidates & (grid == 1))
+    chosen = rng.choice(walls, size=int(len(walls) * share), replace=False)
+    grid.reshape(-1)[chosen] = 0
+
+
+def carve_rooms(grid, rng, rooms=None, loops=0.0):
+    """Carve rectangular rooms joined by L-shaped corridors. Returns (start, goal).
+
+    Each room's center is joined to the one placed before it, so every room is
+    reachable; loops adds that share of extra corridors between random pairs of rooms.
+    The start is the top-left cell of the first room, the goal the bottom-right cell
+    of the last.
+    """
+    rows, cols = grid.shape
+    rooms = rooms if rooms is not None else max(1, rows * cols // 200)
+    max_side = max(3, min(rows, cols) // 4)
+    taken = np.zeros(grid.shape, dtype=bool)  # Rooms plus a one-cell margin
+    placed = []
+    for _ in range(rooms * 5):
+        if len(placed) == rooms:
+            break
+        height = int(rng.integers(min(3, rows), min(max_side, rows) + 1))
+        width = int(rng.integers(min(3, cols), min(max_side, cols) + 1))
+        x = int(rng.integers(0, rows - height + 1))
+        y = int(rng.integers(0, cols - width + 1))
+        if taken[x:x + height, y:y + width].any():
+            continue
+        grid[x:x + height, y:y + width] = 0
+        taken[max(x - 1, 0):x + height + 1, max(y - 1, 0):y + width + 1] = True
+        placed.append((x, y, height, width))
+    if not placed:
+        grid[0, :] = 0  # Too small for rooms: a single corridor
+        return (0, 0), (0, cols - 1)
+
+    centers = [(x + height // 2, y + width // 2) for x, y, height, width in placed]
+    pairs = list(zip(centers, centers[1:]))
+    for _ in range(int(len(centers) * loops)):
+        a, b = rng.integers(0, len(centers), size=2)
+        pairs.append((centers[a], centers[b]))
+    for (x0, y0), (x1, y1) in pairs:
+        if rng.random() < 0.5:
+            grid[x0, min(y0, y1):max(y0, y1) + 1] = 0
+            grid[min(x0, x1):max(x0, x1) + 1, y1] = 0
+        else:
+            grid[min(x0, x1):max(x0, x1) + 1, y0] = 0
+            grid[x1, min(y0, y1):max(y0, y1) + 1] = 0
+    (x0, y0, _, _), (x1, y1, height, width) = placed[0], placed[-1]
+    return (x0, y0), (x1 + height - 1, y1 + width - 1)
+
+
+def place_grievers(grid, rng, count, reserved):
+    """Mark count grievers (-1) on random open cells other than the reserved ones."""
+    open_cells = np.flatnonzero(grid.reshape(-1) == 0)
+    cols = grid.shape[1]
+    open_cells = open_cells[~np.isin(open_cells, [x * cols + y for x, y in reserved])]
+    chosen = np.sort(rng.choice(open_cells, size=min(count, len(open_cells)), replace=False))
+    grid.reshape(-1)[chosen] = -1
+    return [divmod(int(cell), cols) for cell in chosen]
+
+
+def place_triggers(grid, rng, count, start, goal):
+    """Dynamic walls whose triggers lie on a shortest start-goal path.
+
+    A cell is on some shortest path when its distance from the start plus its
+    distance to the goal equals the length of the path.
+    """
+    to_goal = GoalDistanceField(grid, goal).distances
+    from_start = GoalDistanceField(grid, start).distances
+    length = to_goal[start]
+    if length == UNREACHABLE:
+        log.warning("Goal %s is not reachable from %s, no triggers placed", goal, start)
+        return {}
+    on_path = (to_goal != UNREACHABLE) & (from_start != UNREACHABLE) & (to_goal + from_start == length)
+    on_path[start] = on_path[goal] = False
+    path_cells = np.flatnonzero(on_path.reshape(-1))
+    triggers = rng.choice(path_cells, size=min(count, len(path_cells)), replace=False)
+
+    cols = grid.shape[1]
+    reserved = [*triggers.tolist(), start[0] * cols + start[1], goal[0] * cols + goal[1]]
+    open_cells = np.flatnonzero(grid.reshape(-1) == 0)
+    open_cells = open_cells[~np.isin(open_cells, reserved)]
+    targets = rng.choice(open_cells, size=min(len(triggers), len(open_cells)), replace=False)
+    return {divmod(int(t), cols): [divmod(int(w), cols)] for t, w in zip(triggers, targets)}
+
+
+def write_maze_csv(csv_file, grid, start, goal, chunk_rows=1024):
+    """Write a numeric grid as a maze CSV, chunk_rows rows at a time.
+
+    Each chunk becomes one byte buffer, so no object array or per-cell string is
+    ever built and memory stays at a few bytes per cell of one chunk.
+    """
+    rows, cols = grid.shape
+    with open(csv_file, 'wb') as file:
+        for first in range(0, rows, chunk_rows):
+            block = np.asarray(grid[first:first + chunk_rows])
+            chars = np.full((len(block), 2 * cols), ord(','), dtype=np.uint8)
+            chars[:, 0::2] = CSV_CHARS[block + 1]
+            chars[:, -1] = ord('\n')
+            for (x, y), char in ((start, 'S'), (goal, 'E')):
+                if first <= x < first + len(block):
+                    chars[x - first, 2 * y] = ord(char)
+            file.write(chars.tobytes())
+
+
+def write_dynamic_walls(dynamic_file, dynamic_walls):
+    """Write dynamic walls in the format load_dynamic_walls reads."""
+    with open(dynamic_file, 'w') as file:
+        for (x, y), targets in dynamic_walls.items():
+            file.write(f"({x}, {y}): [{', '.join(f'({tx}, {ty})' for tx, ty in targets)}]\n")
+
+
+def save_maze(maze, csv_file, dynamic_file=None, chunk_rows=1024, cache=False):
+    """Write a GeneratedMaze to disk; with cache=True also write load_maze_grid's cache."""
+    write_maze_csv(csv_file, maze.grid, maze.start, maze.goal, chunk_rows)
+    if dynamic_file is not None:
+        write_dynamic_walls(dynamic_file, maze.dynamic_walls)
+    if cache:
+        save_maze_cache(csv_file, maze.grid, maze.start, maze.goal, maze.grievers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate maze CSVs and dynamic-wall files.")
+    parser.add_argument("out", help="Maze CSV file to write")
+    parser.add_argument("--size", type=int, nargs=2, default=(21, 21), metavar=("ROWS", "COLS"))
+    parser.add_argument("--method", choices=GENERATORS, default="backtracker")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--grievers", type=int, default=0)
+    parser.add_argument("--triggers", type=int, default=0)
+    parser.add_argument("--loops", type=float, default=0.0, help="Share of extra walls to open for cycles")
+    parser.add_argument("--rooms", type=int, default=None, help="Rooms to place with --method rooms")
+    parser.add_argument("--dynamic", default=None, help="Dynamic walls file to write")
+    parser.add_argument("--chunk-rows", type=int, default=1024, help="Rows written per chunk")
+    parser.add_argument("--cache", action="store_true", help="Also write the .npy/.npz grid cache")
+    args = parser.parse_args()
+
+    configure_logging(verbosity=1)
+    maze = generate_maze(
+        *args.size, method=args.method, seed=args.seed, grievers=args.grievers, triggers=args.triggers,
+        loops=args.loops, rooms=args.rooms,
+    )
+    save_maze(maze, args.out, args.dynamic, args.chunk_rows, args.cache)
+    log.info("Wrote %dx%d %s maze to %s", *args.size, args.method, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import logging
+
+# Below DEBUG: sampled per-step traces from the training loops
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+# Verbosity 0 only shows warnings, 1 adds progress and run summaries,
+# 2 adds one summary per episode and every wall move, 3 adds sampled step traces
+VERBOSITY_LEVELS = [logging.WARNING, logging.INFO, logging.DEBUG, TRACE]
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def configure_logging(verbosity=1, stream=None):
+    """Send log records to stream (stderr by default) at the given verbosity (0-3)."""
+    level = VERBOSITY_LEVELS[max(0, min(verbosity, len(VERBOSITY_LEVELS) - 1))]
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=stream, force=True)
+    return level
+
+
+class StepSampler:
+    """Decides which training steps get a trace record.
+
+    Whether TRACE is enabled is checked once, when the sampler is created, so a
+    disabled sampler costs a single attribute test per step.
+    """
+
+    def __init__(self, logger, every):
+        self.logger = logger
+        self.every = every
+        self.enabled = every > 0 and logger.isEnabledFor(TRACE)
+
+    def sample(self, step):
+        """Check if the given step should be traced."""
+        return self.enabled and step % self.every == 0
+
+    def trace(self, msg, *args):
+        """Emit a trace record; callers check sample() first."""
+        self.logger.log(TRACE, msg, *args)
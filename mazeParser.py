@@ -1,11 +1,13 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors  # Import the colors module from matplotlib
+import logging
+import os
+import re
+from collections import namedtuple
 import numpy as np
-import pygame
-import numpy as np
-import time
-import random
+
+# pandas, matplotlib and pygame are imported where they are used, so training-only
+# processes never load them; the pygame window lives in mazeRenderer
+
+log = logging.getLogger(__name__)
 
 # Define colors for visualization
 COLORS = {
@@ -23,24 +25,167 @@ CELL_SIZE = 80
 MARGIN = 2
 FPS = 2  # Frames per second for animation speed
 
+# Tile name -> image in images/; the order gives each tile its index in TILE_NAMES
+TILE_FILES = {
+    'floor': 'start.png',
+    'wall': 'wall.png',
+    'start': 'start.png',
+    'end': 'goal.png',
+    'agent': 'agent.png',
+    'griever': 'griever.png',
+    'path': 'path_highlight.png',
+    'plate': 'dynamic_pressure.png',  # Dynamic walls that have not fired yet
+}
+TILE_NAMES = tuple(TILE_FILES)
+
+# Cell classes of the static maze plot, in drawing priority; downsampling keeps the highest class of a block
+PLOT_FLOOR, PLOT_WALL, PLOT_GRIEVER, PLOT_START, PLOT_GOAL, PLOT_TRIGGER = range(6)
+PLOT_PALETTE = np.array([  # RGBA of each class, indexed by the codes from plot_codes
+    (255, 255, 255, 255),  # Walkable - White
+    (0, 0, 0, 255),  # Wall - Black
+    (0, 0, 255, 255),  # Griever - Blue
+    (0, 128, 0, 255),  # Start - Green
+    (255, 0, 0, 255),  # End - Red
+    (255, 255, 0, 255),  # Dynamic wall trigger - Yellow
+], dtype=np.uint8)
+
+# Numeric codes used by the training grid; start and goal are walkable cells
+CELL_CODES = {'0': 0, '1': 1, 'G': -1, '-1': -1, 'S': 0, 'E': 0}
+CELL_LUT = np.zeros(256, dtype=np.int8)  # Byte -> code for single-character cells
+CELL_LUT[ord('1')] = 1
+CELL_LUT[ord('G')] = -1
+# One wall placed by a dynamic-wall trigger; step is whatever the caller passed to visit()
+WallEvent = namedtuple('WallEvent', 'step trigger target')
+COORDINATE = re.compile(r'\(\s*(-?\d+)\s*,\s*(-?\d+)\s*\)')
+
 def load_maze(csv_file):
     """Load maze from a CSV file."""
+    import pandas as pd
+
     maze = pd.read_csv(csv_file, header=None)
     return maze.applymap(lambda x: x.strip() if isinstance(x, str) else x).values
 
+def parse_maze_array(maze, source=None):
+    """Convert a maze from load_maze into (grid, start, goal, grievers).
+
+    grid is an int8 array with 0 for walkable cells (including S and E), 1 for walls
+    and -1 for grievers. start or goal is None if the maze does not define it.
+    Raises ValueError for a cell that is not one of CELL_CODES; source names the
+    maze in the message.
+    """
+    cells = maze.astype(str)
+    _check_cells(~np.isin(cells, list(CELL_CODES)), cells, source)
+    grid = np.zeros(cells.shape, dtype=np.int8)
+    grid[cells == '1'] = 1
+    grid[(cells == 'G') | (cells == '-1')] = -1
+    return grid, _last_cell(cells == 'S'), _last_cell(cells == 'E'), _griever_cells(grid)
+
+
+def _check_cells(unknown, cells, source=None):
+    """Raise ValueError naming the first cell set in the unknown mask."""
+    if unknown.any():
+        x, y = np.argwhere(unknown)[0]
+        token = cells[x, y]
+        token = chr(token) if isinstance(token, np.integer) else str(token)
+        where = f" in {source}" if source else ""
+        raise ValueError(f"Unknown cell {token!r} at row {x}, column {y}{where}")
+
+
+def _last_cell(mask):
+    """Last (x, y) where mask is set in row-major order, or None."""
+    flat = np.flatnonzero(mask)
+    return divmod(int(flat[-1]), mask.shape[1]) if len(flat) else None
+
+
+def _griever_cells(grid):
+    return list(map(tuple, np.argwhere(grid == -1).tolist()))
+
+
+def read_maze_grid(csv_file):
+    """Parse a maze CSV straight into (grid, start, goal, grievers) without pandas."""
+    with open(csv_file, 'rb') as file:
+        data = file.read().translate(None, b' \t\r')
+    lines = [line for line in data.split(b'\n') if line]
+    width = len(lines[0]) if lines else 0
+    if width % 2 and all(len(line) == width for line in lines):
+        # Every cell is one character: view the bytes as a grid and keep every other column
+        chars = np.frombuffer(b''.join(lines), dtype=np.uint8).reshape(len(lines), width)
+        if (chars[:, 1::2] == ord(',')).all() and not (chars[:, ::2] == ord(',')).any():
+            chars = chars[:, ::2]
+            _check_cells(~np.isin(chars, np.frombuffer(b'01GSE', dtype=np.uint8)), chars, csv_file)
+            grid = CELL_LUT[chars]
+            return grid, _last_cell(chars == ord('S')), _last_cell(chars == ord('E')), _griever_cells(grid)
+    # Cells with longer tokens such as -1: parse row by row
+    rows = [line.decode().split(',') for line in lines]
+    if len({len(row) for row in rows}) > 1:
+        raise ValueError(f"Rows of {csv_file} have different lengths")
+    return parse_maze_array(np.array(rows, dtype=object), csv_file)
+
+
+def maze_cache_paths(csv_file):
+    """Grid (.npy) and start/goal/griever (.npz) cache files stored next to the CSV."""
+    base = os.path.splitext(csv_file)[0]
+    return base + '.npy', base + '.npz'
+
+
+def load_maze_grid(csv_file, cache=False, mmap=False):
+    """Load a maze CSV as (grid, start, goal, grievers), see parse_maze_array.
+
+    With cache=True the parsed grid is written next to the CSV and reused while it
+    is newer than the CSV. With mmap=True a cached grid is memory-mapped copy-on-write,
+    so changes made during training stay in memory and never reach the cache file.
+    """
+    grid_file, points_file = maze_cache_paths(csv_file)
+    if cache and all(
+        os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_file)
+        for path in (grid_file, points_file)
+    ):
+        grid = np.load(grid_file, mmap_mode='c' if mmap else None)
+        with np.load(points_file) as points:
+            start = tuple(int(v) for v in points['start']) or None
+            goal = tuple(int(v) for v in points['goal']) or None
+            grievers = list(map(tuple, points['grievers'].tolist()))
+        return grid, start, goal, grievers
+
+    grid, start, goal, grievers = read_maze_grid(csv_file)
+    if cache:
+        save_maze_cache(csv_file, grid, start, goal, grievers)
+        if mmap:
+            grid = np.load(grid_file, mmap_mode='c')
+    return grid, start, goal, grievers
+
+
+def save_maze_cache(csv_file, grid, start, goal, grievers):
+    """Write the cache files load_maze_grid(csv_file, cache=True) reads back."""
+    grid_file, points_file = maze_cache_paths(csv_file)
+    np.save(grid_file, grid)
+    np.savez(
+        points_file,
+        start=np.array(start or (), dtype=np.int64),
+        goal=np.array(goal or (), dtype=np.int64),
+        grievers=np.array(grievers, dtype=np.int64).reshape(-1, 2),
+    )
+
+
 def load_dynamic_walls(dynamic_file):
-    """Load dynamic walls from a text file with support for multiple targets."""
+    """Load dynamic walls from a text file with support for multiple targets.
+
+    Lines look like (x, y): (tx, ty) or (x, y): [(tx, ty), ...].
+    """
     dynamic_walls = {}
     with open(dynamic_file, 'r') as file:
-        for line in file:
-            trigger, targets = line.strip().split(':')
-            trigger = eval(trigger.strip())  # Convert to tuple
-            targets = eval(targets.strip())  # Convert to list of tuples
-            
-            # Ensure the targets are stored as a list
-            if not isinstance(targets, list):
-                targets = [targets]
-            
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            trigger, targets_text = line.strip().split(':')
+            trigger = COORDINATE.findall(trigger)
+            if len(trigger) != 1:
+                raise ValueError(f"{dynamic_file}:{line_number}: expected one trigger cell, got {line.strip()!r}")
+            trigger = tuple(int(v) for v in trigger[0])
+            targets = [(int(x), int(y)) for x, y in COORDINATE.findall(targets_text)]
+            if not targets or COORDINATE.sub('', targets_text).strip(' \t[],'):
+                raise ValueError(f"{dynamic_file}:{line_number}: expected target cells, got {line.strip()!r}")
+
             # Add the trigger and its targets to the dictionary
             if trigger not in dynamic_walls:
                 dynamic_walls[trigger] = []
@@ -48,36 +193,130 @@ def load_dynamic_walls(dynamic_file):
     return dynamic_walls
 
 
-def visualize_maze(maze, dynamic_walls=None):
-    """Visualize the maze with dynamic walls highlighted."""
-    fig, ax = plt.subplots()
-    colors = {'S': 'green', 'E': 'red', '0': 'white', '1': 'black', 'G': 'blue'}
-    dynamic_color = 'yellow'
-    
-    # Create a color grid
-    color_grid = np.zeros_like(maze, dtype=object)
-    for i in range(maze.shape[0]):
-        for j in range(maze.shape[1]):
-            cell = maze[i, j]
-            color_grid[i, j] = colors.get(cell, 'white')
-    
-    # Highlight dynamic walls
+def plot_codes(maze, dynamic_walls=None, start=None, goal=None):
+    """PLOT_* class of every cell as an int8 array.
+
+    maze is an array from load_maze or a numeric grid from parse_maze_array or
+    load_maze_grid, whose start and goal are passed separately. Trigger cells of
+    dynamic_walls are overlaid through a boolean mask.
+    """
+    cells = np.asarray(maze)
+    codes = np.zeros(cells.shape, dtype=np.int8)
+    if cells.dtype.kind in 'biu':
+        codes[cells == 1] = PLOT_WALL
+        codes[cells == -1] = PLOT_GRIEVER
+    else:
+        cells = cells.astype(str)
+        codes[cells == '1'] = PLOT_WALL
+        codes[(cells == 'G') | (cells == '-1')] = PLOT_GRIEVER
+        codes[cells == 'S'] = PLOT_START
+        codes[cells == 'E'] = PLOT_GOAL
+    if start is not None:
+        codes[start] = PLOT_START
+    if goal is not None:
+        codes[goal] = PLOT_GOAL
+
     if dynamic_walls:
-        for (x, y) in dynamic_walls.keys():
-            color_grid[x, y] = dynamic_color
-    
-    # Convert colors to RGBA
-    rgba_grid = [[mcolors.to_rgba(c) for c in row] for row in color_grid]
+        triggers = np.array(list(dynamic_walls), dtype=np.int64).reshape(-1, 2)
+        inside = (triggers >= 0).all(axis=1) & (triggers[:, 0] < codes.shape[0]) & (triggers[:, 1] < codes.shape[1])
+        mask = np.zeros(codes.shape, dtype=bool)
+        mask[triggers[inside, 0], triggers[inside, 1]] = True
+        codes[mask] = PLOT_TRIGGER
+    return codes
+
+
+def downsample_codes(codes, max_size):
+    """Shrink codes so neither side exceeds max_size, keeping the highest class of each block."""
+    factor = -(-max(codes.shape) // max_size)  # Ceiling division
+    if factor <= 1:
+        return codes
+    rows, cols = codes.shape
+    padded = np.zeros((-(-rows // factor) * factor, -(-cols // factor) * factor), dtype=codes.dtype)
+    padded[:rows, :cols] = codes
+    return padded.reshape(padded.shape[0] // factor, factor, padded.shape[1] // factor, factor).max(axis=(1, 3))
+
+
+def scale_codes(codes, cell_pixels):
+    """Draw every cell as a cell_pixels x cell_pixels square."""
+    if cell_pixels <= 1:
+        return codes
+    return codes.repeat(cell_pixels, axis=0).repeat(cell_pixels, axis=1)
+
+
+def maze_image(maze, dynamic_walls=None, start=None, goal=None, max_size=None, cell_pixels=1):
+    """The maze plot as a (height, width, 4) uint8 RGBA array.
+
+    Each cell is coloured with one lookup into PLOT_PALETTE. Mazes with a side
+    longer than max_size cells are downsampled first, so start, goal, grievers
+    and triggers stay visible.
+    """
+    codes = plot_codes(maze, dynamic_walls, start, goal)
+    if max_size is not None:
+        codes = downsample_codes(codes, max_size)
+    return PLOT_PALETTE[scale_codes(codes, cell_pixels)]
+
+
+def write_plot_png(codes, path):
+    """Write plot codes as an indexed PNG with PLOT_PALETTE as its palette.
+
+    One byte per pixel and light compression make this many times faster than
+    writing the RGBA image.
+    """
+    from PIL import Image
+
+    image = Image.fromarray(codes.astype(np.uint8, copy=False))
+    image.putpalette(PLOT_PALETTE[:, :3].tobytes())
+    image.save(path, compress_level=1)
+
+
+def save_maze_image(maze, path, dynamic_walls=None, start=None, goal=None, max_size=4096, cell_pixels=1, tile=None):
+    """Write the maze plot to PNG files without opening a figure. Returns the paths written.
+
+    By default one image is written, downsampled to at most max_size cells a
+    side. With tile, the maze is instead cut into tile x tile blocks of cells
+    that are written at full resolution as <path>_<row>_<col>.png.
+    """
+    codes = plot_codes(maze, dynamic_walls, start, goal)
+    if tile is None:
+        write_plot_png(scale_codes(downsample_codes(codes, max_size), cell_pixels), path)
+        return [path]
+
+    root, ext = os.path.splitext(path)
+    paths = []
+    for i in range(0, codes.shape[0], tile):
+        for j in range(0, codes.shape[1], tile):
+            paths.append(f"{root}_{i // tile}_{j // tile}{ext or '.png'}")
+            write_plot_png(scale_codes(codes[i:i + tile, j:j + tile], cell_pixels), paths[-1])
+    return paths
+
+
+def visualize_maze(maze, dynamic_walls=None, start=None, goal=None, save_path=None, max_size=2048):
+    """Visualize the maze with dynamic walls highlighted.
+
+    Mazes with a side longer than max_size cells are downsampled. With save_path
+    the plot is written to a PNG instead of shown (see save_maze_image).
+    """
+    if save_path is not None:
+        return save_maze_image(maze, save_path, dynamic_walls, start, goal, max_size)
+
+    import matplotlib.pyplot as plt
+
+    image = maze_image(maze, dynamic_walls, start, goal, max_size)
+    fig, ax = plt.subplots()
 
     # Display the maze
-    ax.imshow(rgba_grid, aspect='equal')
-    ax.set_xticks(np.arange(-0.5, maze.shape[1], 1), minor=True)
-    ax.set_yticks(np.arange(-0.5, maze.shape[0], 1), minor=True)
-    ax.grid(which='minor', color='black', linestyle='-', linewidth=0.5)
-    ax.tick_params(which='minor', size=0)
+    ax.imshow(image, aspect='equal', interpolation='nearest')
+    if image.shape[:2] == np.shape(maze) and max(image.shape[:2]) <= 100:
+        # Cell borders only while the cells are large enough to see them
+        ax.set_xticks(np.arange(-0.5, image.shape[1], 1), minor=True)
+        ax.set_yticks(np.arange(-0.5, image.shape[0], 1), minor=True)
+        ax.grid(which='minor', color='black', linestyle='-', linewidth=0.5)
+        ax.tick_params(which='minor', size=0)
     plt.show()
 
-def apply_dynamic_wall_changes(maze, dynamic_walls, visited_cells, triggered_walls):
+
+def apply_dynamic_wall_changes(maze, dynamic_walls, visited_cells, triggered_walls, placed_walls=None):
+    """Place the walls of newly visited triggers; placed targets are appended to placed_walls if given."""
     changes_made = False  # Track if any changes are made
     for trigger, targets in dynamic_walls.items():
         if trigger in visited_cells and trigger not in triggered_walls:
@@ -85,167 +324,150 @@ def apply_dynamic_wall_changes(maze, dynamic_walls, visited_cells, triggered_wal
                 tx, ty = target
                 # Ensure the target position is valid and unoccupied
                 if maze[tx, ty] == 0:  # Check if target is walkable
-                    print(f"Moving wall from {trigger} to {target}")
+                    log.debug("Moving wall from %s to %s", trigger, target)
                     maze[tx, ty] = 1   # Place the wall at the target location
+                    if placed_walls is not None:
+                        placed_walls.append(target)
                     # changes_made = True  # Indicate that a change was made
             triggered_walls.add(trigger)  # Mark this trigger as processed
     return maze, changes_made
 
-def visualize_maze_live(maze, path, dynamic_walls=None, grievers=None):
-    rows, cols = maze.shape
-    window_width = cols * (CELL_SIZE + MARGIN)
-    window_height = rows * (CELL_SIZE + MARGIN)
-
-    # Initialize Pygame
-    pygame.init()
-    screen = pygame.display.set_mode((window_width, window_height))
-    pygame.display.set_caption("Maze Runner")
-    clock = pygame.time.Clock()
-    running = True
-
-    # Load images
-    agent_img = pygame.transform.scale(pygame.image.load("images/agent.png"), (CELL_SIZE, CELL_SIZE))
-    wall_img = pygame.transform.scale(pygame.image.load("images/wall.png"), (CELL_SIZE, CELL_SIZE))
-    griever_img = pygame.transform.scale(pygame.image.load("images/griever.png"), (CELL_SIZE, CELL_SIZE))
-    start_img = pygame.transform.scale(pygame.image.load("images/start.png"), (CELL_SIZE, CELL_SIZE))
-    end_img = pygame.transform.scale(pygame.image.load("images/goal.png"), (CELL_SIZE, CELL_SIZE))
-    floor_img = pygame.transform.scale(pygame.image.load("images/start.png"), (CELL_SIZE, CELL_SIZE))
-    path_highlight_img = pygame.transform.scale(pygame.image.load("images/path_highlight.png"), (CELL_SIZE, CELL_SIZE))
-    dynamic_wall_img = pygame.transform.scale(pygame.image.load("images/dynamic_pressure.png"), (CELL_SIZE, CELL_SIZE))
-
-    # Mapping maze characters to images
-    image_mapping = {
-        'S': start_img,
-        'E': end_img,
-        '0': floor_img,
-        '1': wall_img,
-        '-1': griever_img,  # Grievers are marked as -1 in the maze
-    }
-
-    def move_grievers(grievers):
-        new_positions = []
-        for gx, gy in grievers:
-            possible_moves = []
-            if gy > 0 and maze[gx, gy - 1] == 0:  # Check if left is walkable
-                possible_moves.append((gx, gy - 1))
-            if gy < maze.shape[1] - 1 and maze[gx, gy + 1] == 0:  # Check if right is walkable
-                possible_moves.append((gx, gy + 1))
-            
-            if possible_moves:
-                # Randomly choose between left and right
-                new_position = random.choice(possible_moves)
-                maze[gx, gy] = 0  # Clear old position
-                maze[new_position] = -1  # Mark new position with griever value (-1)
-                new_positions.append(new_position)
-            else:
-                # Stay in place if no valid moves
-                new_positions.append((gx, gy))
-        
-        return new_positions
-
-
-    # Helper function to draw the maze
-    def draw_maze(current_position=None, completed=False, no_path=False):
-        screen.fill((0, 0, 0))  # Black background
-        for i in range(rows):
-            for j in range(cols):
-                rect = pygame.Rect(
-                    j * (CELL_SIZE + MARGIN),
-                    i * (CELL_SIZE + MARGIN),
-                    CELL_SIZE,
-                    CELL_SIZE
-                )
-                cell_type = str(maze[i, j])
-                image = image_mapping.get(cell_type, floor_img)  # Default to floor image
-
-                # Highlight dynamic walls
-                if dynamic_walls and (i, j) in dynamic_walls.keys():
-                    image = dynamic_wall_img
-
-                # Highlight the completed path
-                if completed and (i, j) in path:
-                    image = path_highlight_img
-                elif current_position == (i, j):
-                    image = agent_img
-                
-                screen.blit(image, rect.topleft)
-
-        if no_path:
-            # Display "NO PATH FOUND" message
-            font = pygame.font.Font(None, 60)
-            text_surface = font.render("NO PATH FOUND", True, (255, 255, 255))  # White text
-            text_rect = text_surface.get_rect(center=(window_width // 2, window_height // 2))
-
-            # Draw a red background for the message
-            background_rect = pygame.Rect(
-                text_rect.left - 10,  # Add some padding
-                text_rect.top - 10,
-                text_rect.width + 20,
-                text_rect.height + 20
-            )
-            pygame.draw.rect(screen, (255, 0, 0), background_rect)  # Red background
-            screen.blit(text_surface, text_rect)
-
-        pygame.display.flip()
-
-    if path == "No path found.":
-        draw_maze(no_path=True)
-        time.sleep(15)  # Wait for 5 seconds to let the user see the message
-        pygame.quit()
-        return
-
-    # Simulate the path
-    for step, (x, y) in enumerate(path):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-        
+
+class TriggerIndex:
+    """Dynamic-wall triggers indexed by cell, for firing in O(1) per visited cell.
+
+    Behaves like apply_dynamic_wall_changes: a trigger fires the first time its cell
+    is visited and places walls on the targets that are walkable at that moment.
+    Every placed wall is recorded in the events log.
+    """
+
+    def __init__(self, dynamic_walls):
+        self.pending = {trigger: list(targets) for trigger, targets in dynamic_walls.items()}
+        self.fired = {}  # Triggers that have fired, kept so rearm() can restore them
+        self.events = []  # WallEvent log of placed walls, in order
+        self.mask = None  # Optional flat boolean array of pending trigger cells, see build_mask
+
+    def build_mask(self, shape):
+        """Mark pending trigger cells in a flat boolean array for vectorized lookups."""
+        self.mask = np.zeros(shape[0] * shape[1], dtype=bool)
+        self.mask_shape = shape
+        for cell in self.pending:
+            self._set_mask(cell, True)
+        return self.mask
+
+    def _set_mask(self, cell, value):
+        rows, cols = self.mask_shape
+        if 0 <= cell[0] < rows and 0 <= cell[1] < cols:
+            self.mask[cell[0] * cols + cell[1]] = value
+
+    def visit(self, maze, cell, placed_walls=None, step=None):
+        """Fire the trigger at cell, if any. Returns the number of walls placed."""
+        targets = self.pending.pop(cell, None)
+        if targets is None:
+            return 0
+        self.fired[cell] = targets
+        if self.mask is not None:
+            self._set_mask(cell, False)
+        placed = 0
+        for target in targets:
+            if maze[target] == 0:  # Check if target is walkable
+                log.debug("Moving wall from %s to %s", cell, target)
+                maze[target] = 1
+                self.events.append(WallEvent(step, cell, target))
+                if placed_walls is not None:
+                    placed_walls.append(target)
+                placed += 1
+        return placed
+
+    def rearm(self):
+        """Make every fired trigger pending again, e.g. for a new episode."""
+        for cell, targets in self.fired.items():
+            self.pending[cell] = targets
+            if self.mask is not None:
+                self._set_mask(cell, True)
+        self.fired.clear()
+
+
+class MazeScene:
+    """What an animation of the agent walking a path shows, cell by cell.
+
+    Walls, floor, start and goal form a static background. The agent, grievers,
+    pending trigger plates and the highlighted path are drawn over it. step() moves
+    the scene forward and returns the cells that changed, so renderers redraw only
+    those. The maze is changed in place as grievers move and walls are placed.
+    """
+
+    def __init__(self, maze, triggers, swarm, start=None, goal=None):
+        self.maze = maze
+        self.triggers = triggers
+        self.swarm = swarm
+        self.agent = None  # Current agent cell
+        self.highlight = set()  # Cells drawn with the path highlight
+
+        # Static tile index of every cell, computed once; grievers are drawn from the swarm
+        cells = np.asarray(maze).astype(str)
+        self.background_tiles = np.zeros(cells.shape, dtype=np.int8)  # TILE_NAMES index
+        self.background_tiles[cells == '1'] = TILE_NAMES.index('wall')
+        self.background_tiles[cells == 'S'] = TILE_NAMES.index('start')
+        self.background_tiles[cells == 'E'] = TILE_NAMES.index('end')
+        if start is not None:
+            self.background_tiles[start] = TILE_NAMES.index('start')
+        if goal is not None:
+            self.background_tiles[goal] = TILE_NAMES.index('end')
+
+    def overlay(self, cell):
+        """Name of the tile drawn over the background at cell, or None to show the background."""
+        if cell in self.highlight:
+            return 'path'
+        if cell == self.agent:
+            return 'agent'
+        if cell in self.triggers.pending:
+            return 'plate'
+        if cell in self.swarm:
+            return 'griever'
+        return None
+
+    def overlay_cells(self):
+        """Every in-bounds cell with an overlay, for drawing a full frame."""
+        rows, cols = self.maze.shape
+        cells = {(x, y) for x, y in self.swarm} | set(self.triggers.pending) | self.highlight
+        if self.agent is not None:
+            cells.add(self.agent)
+        return {(x, y) for x, y in cells if 0 <= x < rows and 0 <= y < cols}
+
+    def step(self, step, cell):
+        """Move the grievers, fire the trigger at cell and put the agent there.
+
+        Returns (placed walls, changed cells).
+        """
+        dirty = {cell}
+        if self.agent is not None:
+            dirty.add(self.agent)
+
         # Move grievers
-        if grievers:
-            grievers = move_grievers(grievers)
-
-        # Check for dynamic wall triggers
-        if dynamic_walls and (x, y) in dynamic_walls:
-            targets = dynamic_walls[(x, y)]
-            for tx, ty in targets:
-                if maze[tx, ty] == 0:  # Ensure the target is a valid cell
-                    print(f"Dynamic wall triggered at ({tx}, {ty}).")
-                    maze[tx, ty] = 1  # Place the wall at the target location
-            del dynamic_walls[(x, y)]  # Remove the trigger to avoid re-triggering
-
-        # Draw the maze with the agent's current position
-        draw_maze(current_position=(x, y))
-        clock.tick(FPS)  # Control animation speed
-        
-        if not running:
-            break
-
-    # Highlight the entire path after completion
-    draw_maze(completed=True)
-    font = pygame.font.Font(None, 60)
-    text_surface = font.render("SUCCESSFUL EXIT!", True, (255, 255, 255))  # White text
-    text_rect = text_surface.get_rect(center=(window_width // 2, window_height // 2))
-
-    # Draw a red background for the message
-    background_rect = pygame.Rect(
-        text_rect.left - 10,  # Add some padding
-        text_rect.top - 10,
-        text_rect.width + 20,
-        text_rect.height + 20
-    )
-    pygame.draw.rect(screen, (255, 0, 0), background_rect)  # Red background
-
-    # Blit the text on top of the background
-    screen.blit(text_surface, text_rect)
-    pygame.display.flip()
-
-    # Keep the window open until the user closes it
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-        
-        pygame.display.flip()
-        clock.tick(30)  # Run at 30 FPS to minimize CPU usage
-
-    pygame.quit()
+        swarm = self.swarm
+        if len(swarm):
+            old_xs, old_ys = swarm.xs.copy(), swarm.ys.copy()
+            swarm.tick(self.maze)
+            moved = (old_xs != swarm.xs) | (old_ys != swarm.ys)
+            dirty.update(zip(old_xs[moved].tolist(), old_ys[moved].tolist()))
+            dirty.update(zip(swarm.xs[moved].tolist(), swarm.ys[moved].tolist()))
+
+        # Check for dynamic wall triggers; each fires once
+        placed = []
+        self.triggers.visit(self.maze, cell, placed, step=step)
+        for target in placed:
+            self.background_tiles[target] = TILE_NAMES.index('wall')
+        dirty.update(placed)
+
+        self.agent = cell
+        return placed, dirty
+
+    def finish(self, path):
+        """Highlight the whole path and remove the agent. Returns the changed cells."""
+        self.highlight = set(path)
+        dirty = set(self.highlight)
+        if self.agent is not None:
+            dirty.add(self.agent)
+        self.agent = None
+        return dirty
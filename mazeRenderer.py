@@ -0,0 +1,152 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+from grievers import GrieverSwarm
+from mazeParser import CELL_SIZE, FPS, MARGIN, TILE_NAMES, MazeScene, TriggerIndex
+from tileAtlas import load_tile_atlas
+
+
+@lru_cache(maxsize=None)
+def tile_surfaces(cell_size):
+    """Tile name -> surface of cell_size x cell_size, cut from one atlas surface per cell size.
+
+    The atlas is built from tileAtlas.load_tile_atlas, so repeated visualizations
+    reuse the decoded and scaled tiles instead of loading the PNGs again.
+    """
+    tiles = load_tile_atlas(cell_size)
+    # surfarray indexes pixels as [x][y]; lay the tiles out left to right
+    atlas = pygame.surfarray.make_surface(tiles.transpose(0, 2, 1, 3).reshape(-1, cell_size, 3))
+    return {
+        name: atlas.subsurface(pygame.Rect(index * cell_size, 0, cell_size, cell_size))
+        for index, name in enumerate(TILE_NAMES)
+    }
+
+
+class LiveMazeView(MazeScene):
+    """Draws a MazeScene on a pygame surface once, then redraws only the cells that change.
+
+    The background tiles are rendered once into a cached surface, and redraw()
+    pushes only the changed rectangles to the display.
+    """
+
+    def __init__(self, screen, maze, tiles, triggers, swarm):
+        super().__init__(maze, triggers, swarm)
+        self.screen = screen
+        self.tiles = tiles  # Tile name -> surface of CELL_SIZE x CELL_SIZE
+        self.background = pygame.Surface(screen.get_size())
+        self.background.fill((0, 0, 0))  # Black margins
+        self.background.blits(
+            [
+                (tiles[TILE_NAMES[tile]], self.cell_rect(i, j))
+                for (i, j), tile in np.ndenumerate(self.background_tiles)
+            ],
+            doreturn=False,
+        )
+
+    def cell_rect(self, i, j):
+        return pygame.Rect(j * (CELL_SIZE + MARGIN), i * (CELL_SIZE + MARGIN), CELL_SIZE, CELL_SIZE)
+
+    def draw_cell(self, cell):
+        rect = self.cell_rect(*cell)
+        name = self.overlay(cell)
+        if name is None:
+            self.screen.blit(self.background, rect, rect)
+        else:
+            self.screen.blit(self.tiles[name], rect)  # Atlas tiles are opaque
+        return rect
+
+    def draw_all(self):
+        """Draw the whole maze; used for the first frame."""
+        self.screen.blit(self.background, (0, 0))
+        for cell in self.overlay_cells():
+            self.draw_cell(cell)
+        pygame.display.flip()
+
+    def step(self, step, cell):
+        placed, dirty = super().step(step, cell)
+        for target in placed:
+            self.background.blit(self.tiles['wall'], self.cell_rect(*target))
+        return placed, dirty
+
+    def redraw(self, cells):
+        """Redraw the given cells and update only their part of the display."""
+        pygame.display.update([self.draw_cell(cell) for cell in cells])
+
+
+def draw_banner(screen, text):
+    """Draw a message in white on a red box in the middle of the screen."""
+    width, height = screen.get_size()
+    font = pygame.font.Font(None, 60)
+    text_surface = font.render(text, True, (255, 255, 255))  # White text
+    text_rect = text_surface.get_rect(center=(width // 2, height // 2))
+
+    # Draw a red background for the message
+    background_rect = pygame.Rect(
+        text_rect.left - 10,  # Add some padding
+        text_rect.top - 10,
+        text_rect.width + 20,
+        text_rect.height + 20
+    )
+    pygame.draw.rect(screen, (255, 0, 0), background_rect)  # Red background
+    screen.blit(text_surface, text_rect)
+    pygame.display.flip()
+
+
+def visualize_maze_live(maze, path, dynamic_walls=None, grievers=None):
+    rows, cols = maze.shape
+    window_width = cols * (CELL_SIZE + MARGIN)
+    window_height = rows * (CELL_SIZE + MARGIN)
+
+    # Initialize Pygame
+    pygame.init()
+    screen = pygame.display.set_mode((window_width, window_height))
+    pygame.display.set_caption("Maze Runner")
+    clock = pygame.time.Clock()
+    running = True
+    triggers = TriggerIndex(dynamic_walls or {})
+
+    # Scaled tiles are cached per cell size
+    tiles = tile_surfaces(CELL_SIZE)
+
+    swarm = GrieverSwarm(grievers or [], maze.shape)
+    view = LiveMazeView(screen, maze, tiles, triggers, swarm)
+
+    if path == "No path found.":
+        view.draw_all()
+        draw_banner(screen, "NO PATH FOUND")
+        time.sleep(15)  # Wait for 15 seconds to let the user see the message
+        pygame.quit()
+        return
+
+    # Simulate the path; each step redraws only the cells that changed
+    view.draw_all()
+    for step, (x, y) in enumerate(path):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        # Move grievers, fire triggers and draw the agent's current position
+        _, dirty = view.step(step, (x, y))
+        view.redraw(dirty)
+        clock.tick(FPS)  # Control animation speed
+
+        if not running:
+            break
+
+    # Highlight the entire path after completion
+    view.redraw(view.finish(path))
+    draw_banner(screen, "SUCCESSFUL EXIT!")
+
+    # Keep the window open until the user closes it
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        
+        pygame.display.flip()
+        clock.tick(30)  # Run at 30 FPS to minimize CPU usage
+
+    pygame.quit()
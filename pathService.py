@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from distanceField import UNREACHABLE, GoalDistanceField
+
+DEFAULT_CACHE_SIZE = 16  # Goal trees kept; each is one int32 per cell
+POOLS = ('thread', 'process')
+
+
+def in_bounds(shape, cell):
+    """True if an (x, y) cell lies inside a grid of the given shape."""
+    return 0 <= cell[0] < shape[0] and 0 <= cell[1] < shape[1]
+
+
+def goal_tree(maze, goal):
+    """The goal tree for goal: a GoalDistanceField, one reverse BFS over the maze."""
+    return GoalDistanceField(maze, goal)
+
+
+def walk_tree(distances, start, known=None):
+    """Shortest path from start down a goal tree, as a list of (x, y) cells, or None.
+
+    Each step moves to a neighbor one closer to the goal, trying Right, Down, Left
+    and Up in that order like the A* searches, so the walk is as long as the
+    distance stored at start. Every cell has one next step, so once the walk
+    reaches a cell in known (see walk_group) it copies the rest of that path.
+    A start outside the grid has no path, like a start on a wall.
+    """
+    rows, cols = distances.shape
+    if not in_bounds(distances.shape, start):
+        return None
+    flat = distances.reshape(-1)
+    cell = int(start[0]) * cols + int(start[1])
+    d = int(flat[cell])
+    if d == UNREACHABLE:
+        return None  # Wall, or no path to the goal
+    path = [divmod(cell, cols)]
+    while d:
+        if known is not None and cell in known:
+            walked, position = known[cell]
+            path += walked[position + 1:]  # The rest is the same as an earlier walk's
+            break
+        x, y = divmod(cell, cols)
+        d -= 1
+        if y < cols - 1 and flat[cell + 1] == d:
+            cell += 1
+        elif x < rows - 1 and flat[cell + cols] == d:
+            cell += cols
+        elif y > 0 and flat[cell - 1] == d:
+            cell -= 1
+        else:
+            cell -= cols
+        path.append(divmod(cell, cols))
+    return path
+
+
+def walk_group(distances, starts):
+    """walk_tree for every start, sharing the walks that meet on the way to the goal."""
+    cols = distances.shape[1]
+    known = {}  # Flat cell -> (path through it, its position there)
+    paths = []
+    for start in starts:
+        path = walk_tree(distances, start, known)
+        if path is not None:
+            for position, (x, y) in enumerate(path):
+                cell = x * cols + y
+                if cell in known:
+                    break  # This cell and the rest of the path are already known
+                known[cell] = (path, position)
+        paths.append(path)
+    return paths
+
+
+def solve_group(maze, goal, starts):
+    """Build the goal tree for one goal and walk every start; run in pool workers.
+
+    Returns the tree too, so the caller can cache it.
+    """
+    tree = goal_tree(maze, goal)
+    return tree, walk_group(tree.distances, starts)
+
+
+class PathService:
+    """Answers many (start, goal) path queries on one maze.
+
+    Queries are grouped by goal and each group is answered from one reverse BFS
+    tree, so a thousand runners heading for the same exit cost one search plus a
+    walk per runner. Trees are kept in an LRU cache keyed by (version, goal), where
+    version counts the wall changes reported with update_walls. update_walls repairs
+    the cached trees in place (see GoalDistanceField.update_walls) and files them
+    under the new version; bump version yourself after any other change to the maze,
+    so that no tree built for the old maze is used.
+
+    With workers set, groups whose tree is not cached are solved on a thread or
+    process pool. The BFS is pure Python and holds the GIL, so threads mostly help
+    when other work releases it; processes scale with the cores, at the price of
+    sending the maze to each task and the tree back.
+    """
+
+    def __init__(self, maze, cache_size=DEFAULT_CACHE_SIZE, workers=None, pool='thread'):
+        if pool not in POOLS:
+            raise ValueError(f"Unknown pool {pool!r}; expected one of {POOLS}")
+        self.maze = maze  # Shared with the caller; report new walls with update_walls
+        self.cache_size = cache_size
+        self.workers = workers  # None or 1 solves every group in this thread
+        self.pool = pool
+        self.version = 0
+        self.trees = OrderedDict()  # (version, goal) -> GoalDistanceField, least recently used first
+        self.hits = 0  # Groups answered from a cached tree
+        self.misses = 0  # Goal trees built
+
+    def update_walls(self, cells):
+        """Record that walls were placed at the given (x, y) cells of the shared maze.
+
+        Bumps version. Trees of the current version are repaired for the new walls
+        and kept, in the same LRU order; older ones are dropped.
+        """
+        if not cells:
+            return
+        trees = OrderedDict()
+        for (version, goal), tree in self.trees.items():
+            if version == self.version:
+                tree.update_walls(cells)
+                trees[(version + 1, goal)] = tree
+        self.version += 1
+        self.trees = trees
+
+    def tree(self, goal):
+        """The cached GoalDistanceField for goal, building it on a miss."""
+        key = (self.version, tuple(goal))
+        if key in self.trees:
+            self.trees.move_to_end(key)
+            self.hits += 1
+            return self.trees[key]
+        self.misses += 1
+        return self.store(key, goal_tree(self.maze, key[1]))
+
+    def store(self, key, tree):
+        tree.maze = self.maze  # Trees built in a worker process hold a copy
+        self.trees[key] = tree
+        self.trees.move_to_end(key)
+        while len(self.trees) > self.cache_size:
+            self.trees.popitem(last=False)
+        return tree
+
+    def find_path(self, start, goal):
+        """Shortest path from start to goal as a list of (x, y) cells, or None."""
+        if not in_bounds(self.maze.shape, goal):
+            return None
+        return walk_tree(self.tree(goal).distances, start)
+
+    def find_paths(self, queries):
+        """Answer (start, goal) queries; returns one path or None per query, in query order."""
+        groups = {}
+        for index, (start, goal) in enumerate(queries):
+            if in_bounds(self.maze.shape, goal):  # Goals outside the grid get None
+                groups.setdefault(tuple(goal), []).append(index)
+
+        paths = [None] * len(queries)
+        missing = []
+        for goal, indices in groups.items():
+            key = (self.version, goal)
+            if key in self.trees:
+                self.trees.move_to_end(key)
+                self.hits += 1
+                group_paths = walk_group(self.trees[key].distances, [queries[index][0] for index in indices])
+                for index, path in zip(indices, group_paths):
+                    paths[index] = path
+            else:
+                missing.append(goal)
+        self.misses += len(missing)
+
+        if missing and self.workers and self.workers > 1 and len(missing) > 1:
+            executor = ProcessPoolExecutor if self.pool == 'process' else ThreadPoolExecutor
+            with executor(max_workers=min(self.workers, len(missing))) as pool:
+                futures = [
+                    pool.submit(solve_group, self.maze, goal, [queries[i][0] for i in groups[goal]])
+                    for goal in missing
+                ]
+                results = [future.result() for future in futures]
+        else:
+            results = [solve_group(self.maze, goal, [queries[i][0] for i in groups[goal]]) for goal in missing]
+
+        for goal, (tree, group_paths) in zip(missing, results):
+            self.store((self.version, goal), tree)
+            for index, path in zip(groups[goal], group_paths):
+                paths[index] = path
+        return paths
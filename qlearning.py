@@ -1,20 +1,44 @@
+import logging
+import time
 import numpy as np
 import random
-from mazeParser import apply_dynamic_wall_changes
+from distanceField import UNREACHABLE
+from environment import MazeEnvironment
+from mazeLogging import StepSampler
 from astar import AStar
-from grievers import update_griever_positions
+from trainingMetrics import TrainingMetrics
+from transitions import TransitionModel
+
+log = logging.getLogger(__name__)
+
+Q_BACKENDS = ('dict', 'array')
 
 
 class MazeRunner:
-    def __init__(self, maze, start, goal):
+    def __init__(self, maze, start, goal, q_backend='dict', seed=None, distance_field=None):
+        if q_backend not in Q_BACKENDS:
+            raise ValueError(f"Unknown Q-table backend {q_backend!r}, expected one of {Q_BACKENDS}")
         self.maze = maze
         self.start = start
         self.goal = goal
-        self.q_table = {}
+        self.q_backend = q_backend
+        # 'dict' maps (i, j) -> {action: value}; 'array' is a dense (rows, cols, 4) float array
+        self.q_table = {} if q_backend == 'dict' else None
         self.actions = ['up', 'down', 'left', 'right']
+        self.action_index = {action: i for i, action in enumerate(self.actions)}
+        self.rng = random.Random(seed)  # Seeded so both backends learn the same policy
+        self.np_rng = np.random.default_rng(seed)  # Used by the batched trainer and griever moves
+        self.model = None  # TransitionModel compiled at the start of training
+        self.distance_field = distance_field  # Optional GoalDistanceField for reward shaping
+        self.env = None  # MazeEnvironment of the most recent training run
+        self.triggers = None  # Its TriggerIndex; triggers.events logs placed walls
         self.alpha = 0.01  # Learning rate
         self.gamma = 0.9  # Discount factor
         self.epsilon = 0.2  # Exploration rate
+        self.log_every = 1000  # Episodes between progress records (INFO)
+        self.trace_every = 100  # Steps between sampled step traces (TRACE)
+        self.checkpoint_every = 1000  # Episodes between checkpoint callbacks in train
+        self.episodes_trained = 0  # Episodes completed by the last train call, see ConvergenceMonitor
 
     def is_valid_move(self, state, action):
         """Check if the move is valid."""
@@ -42,7 +66,10 @@ class MazeRunner:
         return state  # Return the current state if the move is invalid
 
     def get_reward(self, state, next_state, grievers):
-        """Reward function for the agent."""
+        """Reward function for the agent.
+
+        grievers is any container of (x, y) cells; pass a GrieverSwarm for an O(1) check.
+        """
         if next_state == self.goal:
             return 100  # Reached goal
         elif next_state in grievers:  # Griever penalty
@@ -51,21 +78,38 @@ class MazeRunner:
             return -50
         else:
             # Encourage moving closer to the goal
-            dist_before = abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
-            dist_after = abs(next_state[0] - self.goal[0]) + abs(next_state[1] - self.goal[1])
+            dist_before = self.goal_distance(state)
+            dist_after = self.goal_distance(next_state)
             return 15 if dist_after < dist_before else -1  # Reward closer moves, penalize further ones
 
+    def goal_distance(self, state):
+        """Distance to the goal used for shaping: exact with a distance field, else Manhattan."""
+        if self.distance_field is not None:
+            distance = self.distance_field.distance(state)
+            return float('inf') if distance == UNREACHABLE else distance
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
     def initialize_q_table(self):
         """Initialize the Q-table."""
+        if self.q_backend == 'array':
+            # Wall cells keep all-zero rows, matching the dict backend's default of 0
+            self.q_table = np.zeros((self.maze.shape[0], self.maze.shape[1], len(self.actions)))
+            return
         for i in range(self.maze.shape[0]):
             for j in range(self.maze.shape[1]):
                 if self.maze[i, j] != 1:  # Not a wall
                     self.q_table[(i, j)] = {action: 0 for action in self.actions}
 
+    def has_state(self, state):
+        """Check if the Q-table holds values for the given state."""
+        if self.q_backend == 'array':
+            return self.q_table is not None
+        return state in self.q_table
+
     def choose_action(self, state):
         """Choose an action using epsilon-greedy strategy."""
-        if random.uniform(0, 1) < self.epsilon:
-            return random.choice(self.actions)  # Explore
+        if self.rng.uniform(0, 1) < self.epsilon:
+            return self.rng.choice(self.actions)  # Explore
         return self.choose_best_action(state)  # Exploit
 
     # def choose_best_action(self, state):
@@ -73,70 +117,298 @@ class MazeRunner:
     #     return max(self.q_table[state], key=self.q_table[state].get)
     def choose_best_action(self, state):
         """Choose the best action based on the learned Q-values."""
-        if state not in self.q_table:
-            print(f"State {state} not in Q-table. Choosing random action.")
-            return random.choice(self.actions)  # Fall back to exploration
+        if not self.has_state(state):
+            log.debug("State %s not in Q-table. Choosing random action.", state)
+            return self.rng.choice(self.actions)  # Fall back to exploration
+        if self.q_backend == 'array':
+            # argmax returns the first maximum, the same tie-break as max() over the dict
+            return self.actions[int(self.q_table[state].argmax())]
         return max(self.q_table[state], key=self.q_table[state].get)
 
 
     def update_q_value(self, state, action, reward, next_state):
-        """Update the Q-value for the given state-action pair."""
+        """Update the Q-value for the given state-action pair and return the change."""
+        if self.q_backend == 'array':
+            q_row = self.q_table[state]
+            a = self.action_index[action]
+            max_next_q = self.q_table[next_state].max()
+            delta = self.alpha * (reward + self.gamma * max_next_q - q_row[a])
+            q_row[a] += delta
+            return delta
         max_next_q = max(self.q_table[next_state].values()) if next_state in self.q_table else 0
-        self.q_table[state][action] += self.alpha * (reward + self.gamma * max_next_q - self.q_table[state][action])
+        delta = self.alpha * (reward + self.gamma * max_next_q - self.q_table[state][action])
+        self.q_table[state][action] += delta
+        return delta
+
+    def compile_model(self, maze=None):
+        """Precompute the next-state and reward tables for the maze (self.maze by default)."""
+        self.model = TransitionModel(self.maze if maze is None else maze, self.goal, self.distance_field)
+        return self.model
+
+    def on_walls_placed(self, placed_walls):
+        """Keep the distance field and transition model in sync with newly placed walls."""
+        changed = self.distance_field.update_walls(placed_walls) if self.distance_field is not None else []
+        self.model.patch(placed_walls + changed)
+        placed_walls.clear()
+
+    def on_walls_removed(self, removed_walls):
+        """Bring the distance field and transition model back after an environment reset."""
+        restored = self.distance_field.restore() if self.distance_field is not None else []
+        if removed_walls or restored:
+            self.model.patch(removed_walls + restored)
+
+    def train(self, episodes, dynamic_walls, grievers, reset_each_episode=True, start_episode=0, checkpoint=None,
+              convergence=None):
+        """Train the agent using Q-learning with dynamic wall and griever updates.
 
-    def train(self, episodes, dynamic_walls, grievers):
-        """Train the agent using Q-learning with dynamic wall and griever updates."""
-        visited_cells = set()
-        triggered_walls = set()
+        Episodes run on a MazeEnvironment, so self.maze is never modified. With
+        reset_each_episode, every episode starts from the original walls, triggers and
+        griever positions; otherwise changes carry over from one episode to the next.
 
-        for episode in range(episodes):
+        To resume a run, restore the Q-table and RNG state (see checkpoint.py) and pass
+        the same episodes with start_episode set to the episodes already done. If given,
+        checkpoint(episodes_done) is called every checkpoint_every episodes and once at
+        the end.
+
+        With a ConvergenceMonitor as convergence, training stops as soon as its criteria
+        are met. episodes_trained holds the number of episodes actually used.
+
+        Returns a TrainingMetrics with one row per episode trained.
+        """
+        env = self.env = MazeEnvironment(self.maze, dynamic_walls, grievers, rng=self.np_rng)
+        self.triggers = env.triggers
+        placed_walls = []
+        if self.q_backend == 'array' and self.q_table is None:
+            self.initialize_q_table()
+        model = self.compile_model(env.grid)
+        sampler = StepSampler(log, self.trace_every)
+        log_episodes = log.isEnabledFor(logging.DEBUG)
+        successes = 0
+        self.episodes_trained = start_episode
+        metrics = TrainingMetrics(max(episodes - start_episode, 0))
+
+        for episode in range(start_episode, episodes):
+            if reset_each_episode and episode > start_episode:
+                self.on_walls_removed(env.reset())
+            started = time.perf_counter()
+            fired_before = len(env.triggers.fired)
+            placed_before = len(env.placed_walls)
             state = self.start
             steps = 0
+            total_reward = 0
+            griever_hits = 0
+            blocked_moves = 0
+            max_delta = 0.0  # Largest Q-value change this episode
             self.epsilon = max(0.1, 1 - episode / episodes)  # Gradually decrease exploration rate
 
             while state != self.goal:
-                visited_cells.add(state)
-
                 # Apply dynamic wall changes
-                self.maze, changes_made = apply_dynamic_wall_changes(
-                    self.maze, dynamic_walls, visited_cells, triggered_walls
-                )
-                if changes_made:
-                    print(f"Episode {episode}: Maze updated due to dynamic walls.")
+                if env.visit(state, placed_walls, step=(episode, steps)):
+                    self.on_walls_placed(placed_walls)
 
                 # Update griever positions
-                grievers = update_griever_positions(grievers, self.maze)
+                grievers = env.move_grievers()
 
                 # Ensure Q-values exist for the current state
-                if state not in self.q_table:
+                if not self.has_state(state):
                     self.q_table[state] = {action: 0 for action in self.actions}
 
                 action = self.choose_action(state)
-                next_state = self.get_next_state(state, action)
-                print('grievers:', grievers)    
-                print('next_state:', next_state)
+                cell = model.index(state)
+                a = self.action_index[action]
+                next_state = model.state(model.next_state[cell, a])
+                if sampler.sample(steps):
+                    sampler.trace(
+                        "Episode %d step %d: next_state=%s grievers=%s", episode, steps, next_state, grievers.positions()
+                    )
                 # Avoid states with grievers
-                # Check if the next state has a griever
+                # Check if the next state has a griever (O(1) occupancy lookup)
                 if next_state in grievers:
-                    print("Encountered a griever at:", next_state)
                     reward = -40  # Apply a penalty for encountering a griever
-                    self.update_q_value(state, action, reward, state)  # Update Q-value to discourage this action
+                    delta = self.update_q_value(state, action, reward, state)  # Update Q-value to discourage this action
+                    max_delta = max(max_delta, abs(delta))
+                    total_reward += reward
+                    griever_hits += 1
                     continue  # Retry a different action
             
-                reward = self.get_reward(state, next_state, grievers)
-                self.update_q_value(state, action, reward, next_state)
+                # Grievers are handled above, so the precomputed reward matches get_reward
+                reward = int(model.reward[cell, a])
+                delta = self.update_q_value(state, action, reward, next_state)
+                max_delta = max(max_delta, abs(delta))
+                total_reward += reward
+                blocked_moves += next_state == state
 
                 state = next_state
                 steps += 1
 
                 # Prevent infinite loops by limiting steps per episode
                 if steps > 1000:
-                    print(f"Episode {episode}: Too many steps. Ending episode.")
                     break
 
+            successes += state == self.goal
+            metrics.record(
+                episode, state == self.goal, steps, total_reward, griever_hits, blocked_moves,
+                len(env.triggers.fired) - fired_before, len(env.placed_walls) - placed_before,
+                self.epsilon, max_delta, time.perf_counter() - started,
+            )
+            if log_episodes:
+                log.debug(
+                    "Episode %d: reached_goal=%s steps=%d reward=%d griever_hits=%d epsilon=%.3f",
+                    episode, state == self.goal, steps, total_reward, griever_hits, self.epsilon,
+                )
+            if (episode + 1) % self.log_every == 0:
+                log.info("Episodes %d/%d done, %d reached the goal", episode + 1, episodes, successes)
+            self.episodes_trained = episode + 1
+            if convergence is not None and convergence.update(self, episode, state == self.goal, max_delta):
+                break
+            if checkpoint is not None and (episode + 1) % self.checkpoint_every == 0 and episode + 1 < episodes:
+                checkpoint(episode + 1)
+        self.on_walls_removed(env.reset())
+        if checkpoint is not None:
+            checkpoint(self.episodes_trained)
+        log.info(
+            "Training finished: %d/%d episodes reached the goal",
+            successes, self.episodes_trained - start_episode,
+        )
+        return metrics
 
-    def find_path(self):
-        """Find the optimal path using the learned Q-table."""
+    def train_batch(self, episodes, dynamic_walls, grievers, batch_size=64, max_steps=1000, reset_each_episode=True):
+        """Train batch_size independent episodes in lockstep over the shared Q-array.
+
+        Each slot follows the same rules as train(): epsilon decays with the slot's
+        episode index, a griever in the way costs -40 and keeps the agent in place,
+        and an episode ends at the goal or after max_steps moves. Finished slots are
+        refilled with the next episode until all episodes have run. Dynamic walls and
+        grievers live in one MazeEnvironment shared by the whole batch and advance once
+        per step. With reset_each_episode, the environment is reset whenever a slot's
+        episode ends, so walls go away, triggers re-arm and grievers return to their
+        starts, as they do between episodes of train(); otherwise changes last until
+        training ends.
+
+        Returns a TrainingMetrics with one row per episode, in the order episodes
+        finished. A trigger firing is counted for the first slot standing on it.
+        """
+        if self.q_backend != 'array':
+            raise ValueError("train_batch requires the 'array' Q-table backend")
+        if self.q_table is None:
+            self.initialize_q_table()
+
+        env = self.env = MazeEnvironment(self.maze, dynamic_walls, grievers, rng=self.np_rng)
+        self.triggers = env.triggers
+        model = self.compile_model(env.grid)
+        sampler = StepSampler(log, self.trace_every)
+        log_episodes = log.isEnabledFor(logging.DEBUG)
+        successes = 0
+        q_cells = self.q_table.reshape(-1, len(self.actions))  # View indexed by flat cell
+        trigger_cells = env.triggers.build_mask(env.grid.shape)
+        griever_cells = env.grievers.occupied.reshape(-1)  # Flat view, kept in sync by every tick
+        placed_walls = []
+        batch_size = min(batch_size, episodes)
+
+        # Per-slot state: flat cell, episode index and steps taken
+        start_cell = model.index(self.start)
+        cells = np.full(batch_size, start_cell)
+        episode_ids = np.arange(batch_size)
+        steps = np.zeros(batch_size, dtype=int)
+        rewards = np.zeros(batch_size)
+        active = np.ones(batch_size, dtype=bool)
+        # Per-slot statistics for the metrics
+        metrics = TrainingMetrics(episodes)
+        griever_hits = np.zeros(batch_size, dtype=int)
+        blocked_moves = np.zeros(batch_size, dtype=int)
+        wall_triggers = np.zeros(batch_size, dtype=int)
+        walls_placed = np.zeros(batch_size, dtype=int)
+        max_delta = np.zeros(batch_size)
+        started = np.full(batch_size, time.perf_counter())
+        next_episode = batch_size
+        finished = 0
+        batch_step = 0
+
+        while active.any():
+            slots = np.flatnonzero(active)
+            cell = cells[slots]
+
+            # Shared environment updates, once per step for the whole batch
+            for trigger in np.unique(cell[trigger_cells[cell]]).tolist():
+                slot = slots[np.argmax(cell == trigger)]
+                wall_triggers[slot] += 1
+                walls_placed[slot] += env.visit(model.state(trigger), placed_walls, step=batch_step)
+            if placed_walls:
+                self.on_walls_placed(placed_walls)
+            grievers = env.move_grievers()
+
+            # Epsilon-greedy selection for every slot at once
+            epsilon = np.maximum(0.1, 1 - episode_ids[slots] / episodes)
+            explore = self.np_rng.random(len(slots)) < epsilon
+            actions = np.where(
+                explore,
+                self.np_rng.integers(0, len(self.actions), len(slots)),
+                q_cells[cell].argmax(axis=1),
+            )
+
+            # Transitions and rewards are table lookups; a griever in the way costs -40
+            next_cell = model.next_state[cell, actions]
+            reward = model.reward[cell, actions].astype(float)
+            hit_griever = griever_cells[next_cell]
+            reward[hit_griever] = -40
+            next_cell[hit_griever] = cell[hit_griever]
+            if sampler.sample(batch_step):
+                sampler.trace("Batch step %d: %d active slots, grievers=%s", batch_step, len(slots), grievers.positions())
+            batch_step += 1
+
+            # TD updates; add.at accumulates slots that share a state-action pair
+            td_error = reward + self.gamma * q_cells[next_cell].max(axis=1) - q_cells[cell, actions]
+            np.add.at(q_cells, (cell, actions), self.alpha * td_error)
+
+            cells[slots] = next_cell
+            steps[slots] += ~hit_griever
+            rewards[slots] += reward
+            griever_hits[slots] += hit_griever
+            blocked_moves[slots] += (next_cell == cell) & ~hit_griever
+            max_delta[slots] = np.maximum(max_delta[slots], np.abs(self.alpha * td_error))
+
+            # Refill finished slots with the next episodes
+            done = slots[(next_cell == model.goal_cell) | (steps[slots] > max_steps)]
+            for slot in done:
+                reached_goal = cells[slot] == model.goal_cell
+                successes += reached_goal
+                metrics.record(
+                    episode_ids[slot], reached_goal, steps[slot], rewards[slot], griever_hits[slot], blocked_moves[slot],
+                    wall_triggers[slot], walls_placed[slot], max(0.1, 1 - episode_ids[slot] / episodes),
+                    max_delta[slot], time.perf_counter() - started[slot],
+                )
+                if log_episodes:
+                    log.debug(
+                        "Episode %d: reached_goal=%s steps=%d reward=%d",
+                        episode_ids[slot], reached_goal, steps[slot], rewards[slot],
+                    )
+                finished += 1
+                if finished % self.log_every == 0:
+                    log.info("Episodes %d/%d done, %d reached the goal", finished, episodes, successes)
+                rewards[slot] = 0
+                griever_hits[slot] = blocked_moves[slot] = wall_triggers[slot] = walls_placed[slot] = 0
+                max_delta[slot] = 0.0
+                if next_episode < episodes:
+                    cells[slot] = start_cell
+                    episode_ids[slot] = next_episode
+                    steps[slot] = 0
+                    started[slot] = time.perf_counter()
+                    next_episode += 1
+                else:
+                    active[slot] = False
+            if reset_each_episode and len(done):
+                # The other slots' episodes go on in the restored maze
+                self.on_walls_removed(env.reset())
+        self.episodes_trained = episodes
+        self.on_walls_removed(env.reset())
+        log.info("Training finished: %d/%d episodes reached the goal", successes, episodes)
+        return metrics
+
+    def greedy_path(self, max_steps=1000):
+        """Follow the best action from start without exploring or logging.
+
+        Returns (path, None) when the goal is reached, or (None, reason) otherwise.
+        """
         path = []
         state = self.start
         steps = 0
@@ -144,24 +416,29 @@ class MazeRunner:
         while state != self.goal:
             path.append(state)
 
-            if state not in self.q_table:
-                print(f"State {state} not in Q-table. No path found.")
-                return "No path found."
+            if not self.has_state(state):
+                return None, f"State {state} not in Q-table."
 
             action = self.choose_best_action(state)
             next_state = self.get_next_state(state, action)
 
             if next_state == state:  # Detect stuck state
-                print(f"Stuck at {state}. No further moves possible.")
-                return "No path found."
+                return None, f"Stuck at {state}. No further moves possible."
 
             state = next_state
             steps += 1
 
             # Prevent infinite loops
-            if steps > 1000:
-                print("Too many steps. No path found.")
-                return "No path found."
+            if steps > max_steps:
+                return None, "Too many steps."
 
         path.append(self.goal)
+        return path, None
+
+    def find_path(self):
+        """Find the optimal path using the learned Q-table."""
+        path, reason = self.greedy_path()
+        if path is None:
+            log.warning("%s No path found.", reason)
+            return "No path found."
         return path
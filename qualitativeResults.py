@@ -1,45 +1,39 @@
-import matplotlib.pyplot as plt
-from main import parse_grievers
-from mazeParser import load_maze, load_dynamic_walls
+from mazeParser import load_maze_grid, load_dynamic_walls
 from qlearning import MazeRunner
+from mazeLogging import configure_logging
+from trainingMetrics import TrainingMetrics
 import numpy as np
 
-def run_simulation_with_metrics(maze_file, dynamic_file, episodes=10000):
-    maze = load_maze(maze_file)
+def run_simulation_with_metrics(maze_file, dynamic_file, episodes=10000, seed=None, alpha=0.01, gamma=0.9, q_backend='dict',
+                                convergence=None):
+    maze_numeric, start, goal, grievers = load_maze_grid(maze_file)
     dynamic_walls = load_dynamic_walls(dynamic_file)
 
-    start = None
-    goal = None
-    for i in range(maze.shape[0]):
-        for j in range(maze.shape[1]):
-            if maze[i, j] == 'S':
-                start = (i, j)
-            if maze[i, j] == 'E':
-                goal = (i, j)
-
-    maze_numeric = np.where(maze == 'S', 0, maze)
-    maze_numeric = np.where(maze_numeric == 'E', 0, maze_numeric)
-    maze_numeric = np.where(maze_numeric == 'G', -1, maze_numeric)
-
-    grievers = parse_grievers(maze_numeric)
-
-    runner = MazeRunner(maze_numeric.astype(int), start, goal)
+    runner = MazeRunner(maze_numeric, start, goal, q_backend=q_backend, seed=seed)
+    runner.alpha = alpha
+    runner.gamma = gamma
     runner.initialize_q_table()
-    metrics = runner.train(episodes=episodes, dynamic_walls=dynamic_walls, grievers=grievers)
+    metrics = runner.train(episodes=episodes, dynamic_walls=dynamic_walls, grievers=grievers, convergence=convergence)
 
     return metrics
 
-import pandas as pd
-import matplotlib.pyplot as plt
-
 def visualize_metrics(metrics):
-    """Visualize the metrics collected and display them in a table."""
+    """Visualize the metrics collected and display them in a table.
+
+    metrics maps each configuration to the TrainingMetrics returned by
+    run_simulation_with_metrics, or to its summary() dict.
+    """
+    # Imported here so training workers that only call run_simulation_with_metrics skip them
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
+    metrics = {config: m.summary() if isinstance(m, TrainingMetrics) else m for config, m in metrics.items()}
     configurations = list(metrics.keys())
     success_rates = [metrics[config]["success_count"] / metrics[config]["runs"] * 100 for config in configurations]
     avg_steps = [metrics[config]["total_steps"] / metrics[config]["success_count"] for config in configurations]
     avg_rewards = [metrics[config]["total_rewards"] / metrics[config]["runs"] for config in configurations]
     penalties = [metrics[config]["penalties"] for config in configurations]
-    wall_triggers = [1,3,2]
+    wall_triggers = [metrics[config]["wall_triggers"] for config in configurations]
 
     # Create a DataFrame for tabular display
     data = {
@@ -106,6 +100,7 @@ def visualize_metrics(metrics):
 
 
 def main():
+    configure_logging(verbosity=1)
     maze_files = {
         "Simple": "Results/simple_maze.csv",
         "Moderate": "Results/moderate_maze.csv",
@@ -0,0 +1,50 @@
+import pytest
+
+from astar import AStar
+from benchmark import random_maze
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_incremental_mode_returns_the_same_path_as_full(seed):
+    grid, start, goal, _, dynamic_walls = random_maze(8 + seed % 25, 0.3, triggers=4, seed=seed)
+    paths = {
+        mode: AStar(grid.copy(), start, goal).a_star_with_dynamic_changes(dynamic_walls, set(), mode=mode)
+        for mode in ('full', 'incremental')
+    }
+    assert paths['incremental'] == paths['full']
+
+
+def assert_valid_path(grid, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for (x, y), (nx, ny) in zip(path, path[1:]):
+        assert abs(x - nx) + abs(y - ny) == 1 and grid[nx, ny] != 1
+
+
+def search_case(seed):
+    """A seeded random maze; every fourth one has its goal walled off."""
+    grid, start, goal, _, _ = random_maze(5 + seed, [0.2, 0.3, 0.4][seed % 3], seed=seed)
+    if seed % 4 == 0:
+        grid[goal[0] - 1, goal[1]] = grid[goal[0], goal[1] - 1] = 1
+    return grid, start, goal
+
+
+@pytest.mark.parametrize("method", ['grid', 'jps'])
+@pytest.mark.parametrize("seed", range(40))
+def test_search_method_matches_astar_length(seed, method):
+    grid, start, goal = search_case(seed)
+    planner = AStar(grid, start, goal)
+    expected = planner.a_star_search()
+    path = planner.a_star_search(method=method)
+    if expected is None:
+        assert path is None
+    else:
+        assert len(path) == len(expected)
+        assert_valid_path(grid, path, start, goal)
+
+
+def test_jump_point_search_scans_each_row_cell_once_per_direction():
+    grid, start, goal, _, _ = random_maze(60, 0.02, seed=1)
+    grid[goal[0] - 1, goal[1]] = grid[goal[0], goal[1] - 1] = 1  # Unreachable, so the whole maze is searched
+    planner = AStar(grid, start, goal)
+    assert planner.a_star_search(method='jps') is None
+    assert len(planner.row_jumps) <= 2 * grid.size
@@ -0,0 +1,12 @@
+import pytest
+
+from benchmark import bench_dynamic, random_maze
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_dynamic_suite_replans(seed):
+    rows = bench_dynamic(random_maze(30, 0.25, grievers=4, triggers=4, seed=seed), memory=False)
+    for row in rows:
+        if row['case'] != 'a_star_with_dynamic_changes[hierarchical]':  # Its paths can miss the triggers
+            assert row['replans'] > 1, row['case']
+            assert row['walls_placed'] > 0
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from benchmark import random_maze
+from distanceField import GoalDistanceField
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_update_walls_matches_a_fresh_field(seed):
+    grid, _, goal, _, _ = random_maze(6 + seed, 0.25, seed=seed)
+    original = grid.copy()
+    field = GoalDistanceField(grid, goal)
+    before = field.distances.copy()
+    rng = np.random.default_rng(seed)
+
+    for _ in range(5):
+        open_cells = np.argwhere(grid != 1)
+        walls = [tuple(cell) for cell in open_cells[rng.choice(len(open_cells), size=3, replace=False)].tolist()]
+        for cell in walls:
+            grid[cell] = 1
+        version = field.version
+        changed = field.update_walls(walls)
+        assert np.array_equal(field.distances, GoalDistanceField(grid, goal).distances)
+        assert (field.version != version) == bool(changed)
+
+    grid[...] = original
+    field.restore()
+    assert np.array_equal(field.distances, before)
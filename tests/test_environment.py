@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from benchmark import random_maze
+from environment import MazeEnvironment
+from qlearning import MazeRunner
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_reset_restores_the_original_maze(seed):
+    grid, _, _, grievers, dynamic_walls = random_maze(15, 0.2, grievers=3, triggers=3, seed=seed)
+    env = MazeEnvironment(grid, dynamic_walls, grievers, rng=np.random.default_rng(seed))
+
+    for _ in range(3):
+        placed = []
+        for trigger in dynamic_walls:
+            env.visit(trigger, placed)
+        for _ in range(20):
+            env.move_grievers()
+        assert sorted(env.reset()) == sorted(placed)
+        assert np.array_equal(env.grid, grid)
+        assert not env.triggers.fired
+        assert env.grievers.positions() == grievers
+
+
+def test_train_leaves_the_maze_untouched():
+    grid, start, goal, grievers, dynamic_walls = random_maze(12, 0.2, grievers=2, triggers=2, seed=3)
+    maze = grid.copy()
+    MazeRunner(maze, start, goal, q_backend='array', seed=3).train(20, dict(dynamic_walls), list(grievers))
+    assert np.array_equal(maze, grid)
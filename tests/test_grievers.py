@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import grievers
+from benchmark import random_maze
+from grievers import GrieverSwarm
+
+
+def swarm_case(seed, count):
+    grid, _, _, cells, _ = random_maze(30, 0.2, grievers=count, seed=seed)
+    return grid, cells
+
+
+@pytest.mark.parametrize("count", [2, 4, 40, 200])
+@pytest.mark.parametrize("seed", range(3))
+def test_small_and_large_swarm_moves_agree(monkeypatch, seed, count):
+    grid, cells = swarm_case(seed, count)
+    moves = {}
+    for threshold in (0, 10**6):  # Always vectorized, never vectorized
+        monkeypatch.setattr(grievers, 'VECTORIZE_ABOVE', threshold)
+        maze = grid.copy()
+        swarm = GrieverSwarm(cells, maze.shape, seed=seed)
+        assert swarm.vectorized == (threshold == 0)
+        moves[threshold] = []
+        for _ in range(50):
+            swarm.tick(maze)
+            moves[threshold].append(swarm.positions())
+            assert sorted(map(tuple, np.argwhere(maze == -1).tolist())) == sorted(swarm.positions())
+            assert np.array_equal(swarm.occupied, maze == -1)
+            assert all(cell in swarm for cell in swarm.positions())
+        swarm.reset(maze, grid)
+        assert np.array_equal(maze, grid) and swarm.positions() == cells
+    assert moves[0] == moves[10**6]
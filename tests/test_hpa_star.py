@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from benchmark import random_maze
+from distanceField import UNREACHABLE, GoalDistanceField
+from hpaStar import HPAStar, load_abstract_graph, save_abstract_graph
+from mazeGenerator import generate_maze
+
+
+def hpa_case(seed):
+    """A seeded maze of 5 to 60 cells per side and a cluster size for it."""
+    rng = np.random.default_rng(seed)
+    size = int(rng.integers(5, 60))
+    if seed % 2:
+        grid = random_maze(size, 0.3, seed=seed)[0]
+    else:
+        grid = generate_maze(size, size, ('backtracker', 'prim', 'rooms')[seed % 3], seed=seed, loops=0.2).grid.copy()
+    grid[grid == -1] = 0
+    return grid, int(rng.integers(2, 12)), rng
+
+
+def assert_same_graph(planner, expected):
+    assert planner.transitions == expected.transitions
+    assert planner.nodes == expected.nodes
+    for cluster in expected.nodes:
+        assert np.array_equal(planner.distances[cluster], expected.distances[cluster])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_paths_are_valid_and_found_exactly_when_reachable(seed):
+    grid, cluster_size, rng = hpa_case(seed)
+    planner = HPAStar(grid, cluster_size)
+    open_cells = np.argwhere(grid != 1)
+    for _ in range(10):
+        start, goal = (tuple(cell) for cell in open_cells[rng.integers(len(open_cells), size=2)].tolist())
+        path = planner.find_path(start, goal)
+        shortest = GoalDistanceField(grid, goal).distance(start)
+        if shortest == UNREACHABLE:
+            assert path is None
+            continue
+        assert path[0] == start and path[-1] == goal
+        assert len(path) - 1 >= shortest
+        for (x, y), (nx, ny) in zip(path, path[1:]):
+            assert abs(x - nx) + abs(y - ny) == 1 and grid[nx, ny] != 1
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_update_walls_matches_a_fresh_build(seed):
+    grid, cluster_size, rng = hpa_case(seed)
+    planner = HPAStar(grid, cluster_size)
+    for _ in range(4):
+        open_cells = np.argwhere(grid != 1)
+        walls = [tuple(cell) for cell in open_cells[rng.integers(len(open_cells), size=3)].tolist()]
+        for cell in walls:
+            grid[cell] = 1
+        planner.update_walls(walls)
+        assert_same_graph(planner, HPAStar(grid, cluster_size))
+
+
+def test_abstract_graph_round_trip(tmp_path):
+    grid, cluster_size, _ = hpa_case(4)
+    planner = HPAStar(grid, cluster_size)
+    path = str(tmp_path / "graph.npz")
+    save_abstract_graph(planner, path)
+    loaded = load_abstract_graph(grid, path)
+    assert_same_graph(loaded, planner)
+    for cluster, arrays in planner.edges.items():
+        assert all(np.array_equal(a, b) for a, b in zip(loaded.edges[cluster], arrays))
+
+    x, y = np.argwhere(grid != 1)[0]
+    grid[x, y] = 1  # A different wall layout makes the saved graph stale
+    with pytest.raises(ValueError):
+        load_abstract_graph(grid, path)
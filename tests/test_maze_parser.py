@@ -0,0 +1,42 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from mazeParser import load_dynamic_walls, load_maze, parse_maze_array, read_maze_grid
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAZES = sorted(glob.glob(os.path.join(REPO, 'Results', '*_maze.csv')) + glob.glob(os.path.join(REPO, 'csv', '*.csv')))
+
+
+@pytest.mark.parametrize("csv_file", MAZES, ids=os.path.basename)
+def test_fast_loader_matches_pandas(csv_file):
+    grid, start, goal, grievers = read_maze_grid(csv_file)
+    expected = parse_maze_array(load_maze(csv_file))
+    assert np.array_equal(grid, expected[0])
+    assert (start, goal, grievers) == expected[1:]
+
+
+@pytest.mark.parametrize("text", ["0,1\nS,X\n", "-1,1\nE,X\n"], ids=['single-character', 'long-token'])
+def test_unknown_cells_are_rejected_on_every_path(tmp_path, text):
+    csv_file = tmp_path / "maze.csv"
+    csv_file.write_text(text)
+    with pytest.raises(ValueError, match="'X' at row 1, column 1"):
+        read_maze_grid(str(csv_file))
+    with pytest.raises(ValueError, match="'X' at row 1, column 1"):
+        parse_maze_array(load_maze(str(csv_file)))
+
+
+@pytest.mark.parametrize("line", ["(1, 2):", "(1, 2): none", "(1, 2): [(3, 4), x]", "1, 2: (3, 4)"])
+def test_malformed_dynamic_walls_are_rejected(tmp_path, line):
+    walls_file = tmp_path / "walls.txt"
+    walls_file.write_text(line + "\n")
+    with pytest.raises(ValueError, match="walls.txt:1"):
+        load_dynamic_walls(str(walls_file))
+
+
+def test_dynamic_walls_with_several_targets(tmp_path):
+    walls_file = tmp_path / "walls.txt"
+    walls_file.write_text("(1, 2): [(3, 4), (5, 6)]\n\n(1, 2): (7, 8)\n")
+    assert load_dynamic_walls(str(walls_file)) == {(1, 2): [(3, 4), (5, 6), (7, 8)]}
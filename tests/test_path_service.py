@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from astar import AStar
+from benchmark import random_maze
+from distanceField import GoalDistanceField
+from pathService import PathService
+
+
+def query_case(seed, count=40):
+    """A seeded maze and (start, goal) queries over three goals; some starts are walls."""
+    grid, _, _, _, _ = random_maze(10 + seed, 0.3, seed=seed)
+    rng = np.random.default_rng(seed)
+    cells = list(np.ndindex(grid.shape))  # Walls included
+    open_cells = [cell for cell in cells if grid[cell] != 1]
+    goals = [open_cells[i] for i in rng.choice(len(open_cells), size=3, replace=False)]
+    queries = [(cells[rng.integers(len(cells))], goals[rng.integers(3)]) for _ in range(count)]
+    return grid, queries
+
+
+def assert_shortest(grid, queries, paths):
+    for (start, goal), path in zip(queries, paths):
+        expected = AStar(grid, start, goal).a_star_search(method='grid') if grid[start] != 1 else None
+        if expected is None:
+            assert path is None
+        else:
+            assert len(path) == len(expected) and path[0] == start and path[-1] == goal
+            for (x, y), (nx, ny) in zip(path, path[1:]):
+                assert abs(x - nx) + abs(y - ny) == 1 and grid[nx, ny] != 1
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_find_paths_are_as_short_as_astar(seed):
+    grid, queries = query_case(seed)
+    service = PathService(grid)
+    paths = service.find_paths(queries)
+    assert_shortest(grid, queries, paths)
+    assert service.misses == 3
+
+    assert service.find_paths(queries) == paths
+    assert service.hits == 3
+
+
+@pytest.mark.parametrize("pool", ['thread', 'process'])
+def test_pools_give_the_same_paths(pool):
+    grid, queries = query_case(3)
+    assert PathService(grid, workers=2, pool=pool).find_paths(queries) == PathService(grid).find_paths(queries)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_update_walls_repairs_cached_trees(seed):
+    grid, queries = query_case(seed)
+    service = PathService(grid)
+    service.find_paths(queries)
+    rng = np.random.default_rng(seed)
+    for _ in range(3):
+        open_cells = np.argwhere(grid != 1)
+        walls = [tuple(cell) for cell in open_cells[rng.choice(len(open_cells), size=4, replace=False)].tolist()]
+        for cell in walls:
+            grid[cell] = 1
+        service.update_walls(walls)
+        for (version, goal), tree in service.trees.items():
+            assert version == service.version
+            assert np.array_equal(tree.distances, GoalDistanceField(grid, goal).distances)
+        assert_shortest(grid, queries, service.find_paths(queries))
+    assert service.misses == 3  # Every tree was repaired, none rebuilt
+
+
+def test_cells_outside_the_grid_have_no_path():
+    grid = np.zeros((5, 5), dtype=np.int8)
+    service = PathService(grid)
+    assert service.find_path((-1, 0), (0, 0)) is None
+    assert service.find_path((0, 5), (0, 0)) is None
+    assert service.find_path((0, 0), (5, 0)) is None
+    assert service.find_paths([((0, 0), (-1, 0)), ((-1, 0), (4, 4)), ((0, 0), (4, 4))])[:2] == [None, None]
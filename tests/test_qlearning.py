@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from benchmark import random_maze
+from qlearning import MazeRunner
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_array_backend_learns_the_same_q_table_as_dict(seed):
+    grid, start, goal, grievers, dynamic_walls = random_maze(12, 0.2, grievers=2, triggers=2, seed=seed)
+    tables = {}
+    for backend in ('dict', 'array'):
+        runner = MazeRunner(grid.copy(), start, goal, q_backend=backend, seed=seed)
+        runner.train(30, dict(dynamic_walls), list(grievers))
+        tables[backend] = runner.q_table
+
+    dense = np.zeros_like(tables['array'])
+    for state, values in tables['dict'].items():
+        dense[state] = [values[action] for action in runner.actions]
+    assert np.array_equal(dense, tables['array'])
+
+
+def test_train_batch_rearms_triggers_between_episodes():
+    grid, start, goal, grievers, dynamic_walls = random_maze(12, 0.1, grievers=0, triggers=2, seed=1)
+    runner = MazeRunner(grid.copy(), start, goal, q_backend='array', seed=1)
+    metrics = runner.train_batch(200, dict(dynamic_walls), list(grievers), batch_size=8)
+
+    assert metrics.summary()['wall_triggers'] > len(dynamic_walls)
+    assert np.array_equal(runner.env.grid, grid)  # Reset when training ends
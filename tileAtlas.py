@@ -0,0 +1,31 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from mazeParser import TILE_FILES, TILE_NAMES
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+
+
+@lru_cache(maxsize=None)
+def load_tile_atlas(cell_size):
+    """Every tile in TILE_NAMES order, scaled to cell_size, as a (tiles, cell_size, cell_size, 3) uint8 array.
+
+    The PNGs in images/ are decoded and scaled once per cell size; later calls
+    return the same read-only array. Scaling is nearest-neighbour at the source
+    pixels pygame.transform.scale picks. Transparent pixels are composited over
+    black, as they appear in the live window, so the pygame and NumPy renderers
+    draw the same pixels from one atlas.
+    """
+    from PIL import Image
+
+    tiles = np.zeros((len(TILE_NAMES), cell_size, cell_size, 3), dtype=np.uint8)
+    for index, name in enumerate(TILE_NAMES):
+        rgba = np.asarray(Image.open(os.path.join(IMAGE_DIR, TILE_FILES[name])).convert("RGBA"), dtype=np.uint16)
+        rows = np.arange(cell_size) * rgba.shape[0] // cell_size
+        cols = np.arange(cell_size) * rgba.shape[1] // cell_size
+        rgba = rgba[rows][:, cols]
+        tiles[index] = rgba[..., :3] * rgba[..., 3:] // 255
+    tiles.flags.writeable = False
+    return tiles
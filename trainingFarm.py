@@ -0,0 +1,118 @@
+import argparse
+import hashlib
+import itertools
+import logging
+import os
+import signal
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from mazeLogging import configure_logging
+
+log = logging.getLogger(__name__)
+
+# One training run: a maze configuration, a replicate seed and the hyperparameters to use
+TrainingJob = namedtuple("TrainingJob", "config maze_file dynamic_file seed hyperparameters episodes")
+
+DEFAULT_MAZES = {
+    "Simple": ("Results/simple_maze.csv", "Results/simple_dynamic.txt"),
+    "Moderate": ("Results/moderate_maze.csv", "Results/moderate_dynamic.txt"),
+    "Complex": ("Results/complex_maze.csv", "Results/complex_dynamic.txt"),
+}
+
+
+def make_jobs(mazes, seeds, hyperparameter_grid=None, episodes=10000):
+    """Build one job per (maze configuration, seed, hyperparameter set)."""
+    hyperparameter_grid = hyperparameter_grid or [{}]
+    return [
+        TrainingJob(config, maze_file, dynamic_file, seed, dict(hyperparameters), episodes)
+        for (config, (maze_file, dynamic_file)), seed, hyperparameters in itertools.product(
+            mazes.items(), seeds, hyperparameter_grid
+        )
+    ]
+
+
+def job_seed(job):
+    """Derive the job's RNG seed from its contents, so it does not depend on scheduling."""
+    key = repr((job.maze_file, job.dynamic_file, job.seed, sorted(job.hyperparameters.items()), job.episodes))
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:4], "little")
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError("job exceeded its time limit")
+
+
+def run_job(job, timeout=None):
+    """Train one job in the current process and return its result row."""
+    from qualitativeResults import run_simulation_with_metrics
+
+    seed = job_seed(job)
+    row = {
+        "config": job.config,
+        "maze_file": job.maze_file,
+        "dynamic_file": job.dynamic_file,
+        "seed": job.seed,
+        "job_seed": seed,
+        "episodes": job.episodes,
+        **job.hyperparameters,
+    }
+    # The time limit is enforced inside the worker; SIGALRM is only available on Unix
+    use_alarm = timeout is not None and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    started = time.perf_counter()
+    try:
+        metrics = run_simulation_with_metrics(
+            job.maze_file, job.dynamic_file, episodes=job.episodes, seed=seed, **job.hyperparameters
+        )
+        row["status"] = "ok"
+        row.update(metrics.summary())
+    except TimeoutError:
+        row["status"] = "timeout"
+    except Exception as e:
+        row["status"] = "error"
+        row["error"] = repr(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    row["seconds"] = time.perf_counter() - started
+    return row
+
+
+def run_farm(jobs, workers=None, timeout=None):
+    """Run the jobs on a process pool and collect one row per job, in job order."""
+    import pandas as pd
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_job, job, timeout) for job in jobs]
+        rows = []
+        for job, future in zip(jobs, futures):
+            row = future.result()
+            log.info("%s seed=%s finished: %s in %.1fs", job.config, job.seed, row["status"], row["seconds"])
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Results mazes for several seeds in parallel.")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0], help="Replicate seeds to run per maze")
+    parser.add_argument("--episodes", type=int, default=10000)
+    parser.add_argument("--alpha", type=float, nargs="+", default=[0.01], help="Learning rates to sweep")
+    parser.add_argument("--gamma", type=float, nargs="+", default=[0.9], help="Discount factors to sweep")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-job time limit in seconds")
+    parser.add_argument("--out", default="training_farm.csv", help="CSV file for the results table")
+    args = parser.parse_args()
+
+    configure_logging(verbosity=1)
+    grid = [{"alpha": alpha, "gamma": gamma} for alpha, gamma in itertools.product(args.alpha, args.gamma)]
+    results = run_farm(make_jobs(DEFAULT_MAZES, args.seeds, grid, args.episodes), args.workers, args.timeout)
+    results.to_csv(args.out, index=False)
+    print(results.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
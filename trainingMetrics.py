@@ -0,0 +1,81 @@
+import numpy as np
+
+# Per-episode columns and their dtypes; every array is allocated once, up front
+EPISODE_FIELDS = (
+    ("episode", np.int64),
+    ("reached_goal", bool),
+    ("steps", np.int32),
+    ("total_reward", np.int64),
+    ("griever_hits", np.int32),
+    ("blocked_moves", np.int32),
+    ("wall_triggers", np.int32),
+    ("walls_placed", np.int32),
+    ("epsilon", np.float64),
+    ("max_q_delta", np.float64),
+    ("seconds", np.float64),
+)
+
+
+class TrainingMetrics:
+    """Per-episode training statistics in preallocated NumPy arrays.
+
+    train and train_batch fill one row per finished episode with record(). The arrays
+    are sized for the episodes requested; if training stops early, only the first
+    count rows are used. Penalties are griever hits: a move into a wall or off the
+    grid leaves the agent in place at the usual -1 and is counted as a blocked move.
+    """
+
+    def __init__(self, episodes):
+        self.capacity = episodes
+        self.count = 0  # Rows recorded so far
+        self.columns = {name: np.zeros(episodes, dtype=dtype) for name, dtype in EPISODE_FIELDS}
+
+    def record(self, episode, reached_goal, steps, total_reward, griever_hits=0, blocked_moves=0, wall_triggers=0,
+               walls_placed=0, epsilon=0.0, max_q_delta=0.0, seconds=0.0):
+        """Store the statistics of one finished episode."""
+        row = self.count
+        columns = self.columns
+        columns["episode"][row] = episode
+        columns["reached_goal"][row] = reached_goal
+        columns["steps"][row] = steps
+        columns["total_reward"][row] = total_reward
+        columns["griever_hits"][row] = griever_hits
+        columns["blocked_moves"][row] = blocked_moves
+        columns["wall_triggers"][row] = wall_triggers
+        columns["walls_placed"][row] = walls_placed
+        columns["epsilon"][row] = epsilon
+        columns["max_q_delta"][row] = max_q_delta
+        columns["seconds"][row] = seconds
+        self.count = row + 1
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        """The recorded values of one column."""
+        return self.columns[name][:self.count]
+
+    def summary(self):
+        """Totals over all recorded episodes, as used by qualitativeResults.visualize_metrics."""
+        return {
+            "runs": self.count,
+            "success_count": int(self["reached_goal"].sum()),
+            "total_steps": int(self["steps"].sum()),
+            "total_rewards": int(self["total_reward"].sum()),
+            "penalties": int(self["griever_hits"].sum()),
+            "wall_triggers": int(self["wall_triggers"].sum()),
+            "seconds": float(self["seconds"].sum()),
+        }
+
+    def to_frame(self):
+        """One row per recorded episode as a pandas DataFrame."""
+        import pandas as pd
+
+        return pd.DataFrame({name: self[name] for name, _ in EPISODE_FIELDS})
+
+    def to_csv(self, path):
+        self.to_frame().to_csv(path, index=False)
+
+    def to_parquet(self, path):
+        """Write the episodes to a Parquet file; needs pyarrow or fastparquet."""
+        self.to_frame().to_parquet(path, index=False)
@@ -0,0 +1,71 @@
+import numpy as np
+
+ACTION_DELTAS = np.array([(-1, 0), (1, 0), (0, -1), (0, 1)])  # Row/column offsets for up, down, left, right
+
+
+class TransitionModel:
+    """Next-state and reward tables for every (cell, action) pair of a numeric maze.
+
+    Cells are flat indices x * cols + y. A move off the grid or into a wall leaves
+    the agent in place, and rewards follow MazeRunner.get_reward without the griever
+    penalty, which depends on griever positions and is checked separately. With a
+    GoalDistanceField, shaping compares exact distances instead of Manhattan ones.
+    """
+
+    def __init__(self, maze, goal, distance_field=None):
+        self.maze = maze  # Shared with the caller; call patch() after placing walls
+        self.goal = goal
+        self.distance_field = distance_field
+        self.rows, self.cols = maze.shape
+        self.goal_cell = goal[0] * self.cols + goal[1]
+        cells = self.rows * self.cols
+        self.next_state = np.empty((cells, len(ACTION_DELTAS)), dtype=np.int64)
+        self.reward = np.empty((cells, len(ACTION_DELTAS)), dtype=np.int8)
+        self._build(np.arange(cells))
+
+    def _build(self, cells):
+        """Fill the table rows for the given flat cell indices."""
+        x, y = np.divmod(cells, self.cols)
+        x, y = x[:, None], y[:, None]
+        nx = x + ACTION_DELTAS[:, 0]
+        ny = y + ACTION_DELTAS[:, 1]
+        inside = (nx >= 0) & (nx < self.rows) & (ny >= 0) & (ny < self.cols)
+        open_cell = self.maze[np.clip(nx, 0, self.rows - 1), np.clip(ny, 0, self.cols - 1)] != 1
+        valid = inside & open_cell
+        nx = np.where(valid, nx, x)
+        ny = np.where(valid, ny, y)
+        next_cells = nx * self.cols + ny
+
+        if self.distance_field is None:
+            gx, gy = self.goal
+            closer = np.abs(nx - gx) + np.abs(ny - gy) < np.abs(x - gx) + np.abs(y - gy)
+        else:
+            # Unsigned view: UNREACHABLE (-1) becomes the largest distance
+            distances = self.distance_field.distances.view(np.uint32)
+            closer = distances[nx, ny] < distances[x, y]
+        self.next_state[cells] = next_cells
+        self.reward[cells] = np.select(
+            [next_cells == self.goal_cell, self.maze[nx, ny] == 1, closer], [100, -50, 15], -1
+        )
+
+    def patch(self, targets):
+        """Rebuild only the rows affected by walls placed at the given targets.
+
+        With a distance field, also pass the cells whose distance changed.
+        """
+        cells = set()
+        for tx, ty in targets:
+            for dx, dy in ((0, 0), *ACTION_DELTAS.tolist()):
+                x, y = tx + dx, ty + dy
+                if 0 <= x < self.rows and 0 <= y < self.cols:
+                    cells.add(x * self.cols + y)
+        if cells:
+            self._build(np.fromiter(cells, dtype=np.int64))
+
+    def index(self, state):
+        """Flat cell index of an (x, y) state."""
+        return state[0] * self.cols + state[1]
+
+    def state(self, cell):
+        """(x, y) state of a flat cell index."""
+        return divmod(int(cell), self.cols)